@@ -170,7 +170,7 @@ async def get_agent_configuration(
             raise HTTPException(status_code=404, detail="Agent configuration not found")
 
         # Check if user has access to this agent
-        if agent.user_id != current_user.id and current_user.id not in agent.shared_with and not agent.is_public:
+        if not agent.can_access(current_user.id):
             raise HTTPException(status_code=403, detail="Access denied")
 
         # Ensure backward compatibility for missing fields
@@ -353,7 +353,7 @@ async def create_agent_session(
         if not agent:
             raise HTTPException(status_code=404, detail="Agent configuration not found")
         
-        if agent.user_id != current_user.id and current_user.id not in agent.shared_with and not agent.is_public:
+        if not agent.can_access(current_user.id):
             raise HTTPException(status_code=403, detail="Access denied to agent")
         
         # Add user_id to session data
@@ -364,12 +364,7 @@ async def create_agent_session(
         # Create session
         session = await crud_agent_session.create(db, obj_in=session_data)
         
-        return AgentSessionResponse(
-            id=str(session.id),
-            agent_id=str(session.agent_id),
-            user_id=str(session.user_id),
-            **session.model_dump(exclude={"id", "agent_id", "user_id"})
-        )
+        return AgentSessionResponse.from_model(session)
         
     except HTTPException:
         raise
@@ -398,15 +393,7 @@ async def list_agent_sessions(
         else:
             sessions = await crud_agent_session.get_by_user(db, current_user.id)
         
-        return [
-            AgentSessionResponse(
-                id=str(session.id),
-                agent_id=str(session.agent_id),
-                user_id=str(session.user_id),
-                **session.model_dump(exclude={"id", "agent_id", "user_id"})
-            )
-            for session in sessions
-        ]
+        return [AgentSessionResponse.from_model(session) for session in sessions]
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list agent sessions: {str(e)}")
@@ -431,12 +418,7 @@ async def get_agent_session(
         if session.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        return AgentSessionResponse(
-            id=str(session.id),
-            agent_id=str(session.agent_id),
-            user_id=str(session.user_id),
-            **session.model_dump(exclude={"id", "agent_id", "user_id"})
-        )
+        return AgentSessionResponse.from_model(session)
         
     except HTTPException:
         raise
@@ -469,12 +451,7 @@ async def update_agent_session(
             db, db_obj=session, obj_in=session_update.model_dump(exclude_unset=True)
         )
         
-        return AgentSessionResponse(
-            id=str(updated_session.id),
-            agent_id=str(updated_session.agent_id),
-            user_id=str(updated_session.user_id),
-            **updated_session.model_dump(exclude={"id", "agent_id", "user_id"})
-        )
+        return AgentSessionResponse.from_model(updated_session)
         
     except HTTPException:
         raise
@@ -545,15 +522,7 @@ async def get_agent_metrics(
             db, ObjectId(agent_id), start_date, end_date
         )
         
-        return [
-            AgentMetricsResponse(
-                id=str(metric.id),
-                agent_id=str(metric.agent_id),
-                user_id=str(metric.user_id),
-                **metric.model_dump(exclude={"id", "agent_id", "user_id"})
-            )
-            for metric in metrics
-        ]
+        return [AgentMetricsResponse.from_model(metric) for metric in metrics]
         
     except HTTPException:
         raise
@@ -4,12 +4,13 @@ Endpoints for managing chat conversations, messages, and feedback
 """
 
 from typing import Any, List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from motor.core import AgnosticDatabase
 from odmantic import ObjectId
 from uuid import uuid4
 
 from app.api.deps import get_current_user, get_database
+from app.core.time_utils import datetime_now_sec
 from app.models.user import User
 from app.models.chat import ChatConversation, Message, ConversationFeedback, ConversationTemplate, ConversationStatus
 from app.schemas.chat import (
@@ -30,6 +31,7 @@ from app.schemas.chat import (
     MessageListResponse,
     ConversationSearchRequest
 )
+from app.schemas.base_schema import validate_rows
 from app.crud import (
     crud_chat_conversation,
     crud_message,
@@ -80,13 +82,7 @@ async def create_conversation(
         # Create conversation
         conversation = await crud_chat_conversation.create(db, obj_in=conversation_data)
         
-        return ChatConversationResponse(
-            id=str(conversation.id),
-            user_id=str(conversation.user_id),
-            agent_id=str(conversation.agent_id),
-            shared_with=[str(uid) for uid in conversation.shared_with],
-            **conversation.model_dump(exclude={"id", "user_id", "agent_id", "shared_with"})
-        )
+        return ChatConversationResponse.from_model(conversation)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create conversation: {str(e)}")
@@ -128,22 +124,25 @@ async def list_conversations(
         paginated_conversations = conversations[start_idx:end_idx]
         
         # Convert to response format
-        conversation_responses = [
-            ChatConversationResponse(
-                id=str(conv.id),
-                user_id=str(conv.user_id),
-                agent_id=str(conv.agent_id),
-                shared_with=[str(uid) for uid in conv.shared_with],
-                **conv.model_dump(exclude={"id", "user_id", "agent_id", "shared_with"})
+        conversation_responses = validate_rows(
+            ChatConversationResponse,
+            (
+                {
+                    "id": str(conv.id),
+                    "user_id": str(conv.user_id),
+                    "agent_id": str(conv.agent_id),
+                    "shared_with": [str(uid) for uid in conv.shared_with],
+                    **conv.model_dump(exclude={"id", "user_id", "agent_id", "shared_with"})
+                }
+                for conv in paginated_conversations
             )
-            for conv in paginated_conversations
-        ]
+        )
         
-        return ConversationListResponse(
-            conversations=conversation_responses,
-            total=len(conversations),
-            page=page,
-            page_size=page_size
+        return Response(
+            content=ConversationListResponse.render_json(
+                conversation_responses, total=len(conversations), page=page, page_size=page_size
+            ),
+            media_type="application/json"
         )
         
     except Exception as e:
@@ -166,18 +165,10 @@ async def get_conversation(
             raise HTTPException(status_code=404, detail="Conversation not found")
         
         # Check if user has access
-        if (conversation.user_id != current_user.id and 
-            current_user.id not in conversation.shared_with and 
-            not conversation.is_shared):
+        if not conversation.can_access(current_user.id):
             raise HTTPException(status_code=403, detail="Access denied")
         
-        return ChatConversationResponse(
-            id=str(conversation.id),
-            user_id=str(conversation.user_id),
-            agent_id=str(conversation.agent_id),
-            shared_with=[str(uid) for uid in conversation.shared_with],
-            **conversation.model_dump(exclude={"id", "user_id", "agent_id", "shared_with"})
-        )
+        return ChatConversationResponse.from_model(conversation)
         
     except HTTPException:
         raise
@@ -210,13 +201,7 @@ async def update_conversation(
             db, db_obj=conversation, obj_in=conversation_update.model_dump(exclude_unset=True)
         )
         
-        return ChatConversationResponse(
-            id=str(updated_conversation.id),
-            user_id=str(updated_conversation.user_id),
-            agent_id=str(updated_conversation.agent_id),
-            shared_with=[str(uid) for uid in updated_conversation.shared_with],
-            **updated_conversation.model_dump(exclude={"id", "user_id", "agent_id", "shared_with"})
-        )
+        return ChatConversationResponse.from_model(updated_conversation)
         
     except HTTPException:
         raise
@@ -284,18 +269,16 @@ async def create_message(
         from app.models.chat import MessageContent
 
         # Convert MessageContentSchema to MessageContent ODMantic models
-        content_models = []
-        for content_item in message_in.content:
-            content_model = MessageContent(
-                type=content_item.type,
-                text=content_item.text,
-                image_url=content_item.image_url,
-                file_url=content_item.file_url,
-                file_name=content_item.file_name,
-                file_size=content_item.file_size,
-                metadata=content_item.metadata
-            )
-            content_models.append(content_model)
+        content_models = [
+            MessageContent(**content_item.model_dump()) for content_item in message_in.content
+        ]
+
+        # Stamp tool calls that arrived without a timestamp with one shared clock read
+        now = datetime_now_sec()
+        tool_calls = [
+            {**call.model_dump(exclude={"timestamp"}), "timestamp": call.timestamp or now}
+            for call in message_in.tool_calls
+        ]
 
         # Create CRUD schema with proper ObjectId and converted content
         crud_message_data = CRUDMessageCreate(
@@ -304,7 +287,7 @@ async def create_message(
             role=message_in.role,
             content=content_models,
             raw_content=message_in.raw_content,
-            tool_calls=message_in.tool_calls
+            tool_calls=tool_calls
         )
 
         print(f"DEBUG: CRUD message data: {crud_message_data}")
@@ -348,9 +331,7 @@ async def list_messages(
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
-        if (conversation.user_id != current_user.id and 
-            current_user.id not in conversation.shared_with and 
-            not conversation.is_shared):
+        if not conversation.can_access(current_user.id):
             raise HTTPException(status_code=403, detail="Access denied")
         
         # Get messages
@@ -366,20 +347,23 @@ async def list_messages(
             total = len(messages) + skip  # Approximation
         
         # Convert to response format
-        message_responses = [
-            MessageResponse(
-                id=str(msg.id),
-                conversation_id=str(msg.conversation_id),
-                **msg.model_dump(exclude={"id", "conversation_id"})
+        message_responses = validate_rows(
+            MessageResponse,
+            (
+                {
+                    "id": str(msg.id),
+                    "conversation_id": str(msg.conversation_id),
+                    **msg.model_dump(exclude={"id", "conversation_id"})
+                }
+                for msg in messages
             )
-            for msg in messages
-        ]
+        )
         
-        return MessageListResponse(
-            messages=message_responses,
-            total=total,
-            page=page,
-            page_size=page_size
+        return Response(
+            content=MessageListResponse.render_json(
+                message_responses, total=total, page=page, page_size=page_size
+            ),
+            media_type="application/json"
         )
         
     except HTTPException:
@@ -408,9 +392,7 @@ async def get_message(
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
-        if (conversation.user_id != current_user.id and 
-            current_user.id not in conversation.shared_with and 
-            not conversation.is_shared):
+        if not conversation.can_access(current_user.id):
             raise HTTPException(status_code=403, detail="Access denied")
         
         return MessageResponse(
@@ -564,9 +546,7 @@ async def list_conversation_feedback(
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
-        if (conversation.user_id != current_user.id and 
-            current_user.id not in conversation.shared_with and 
-            not conversation.is_shared):
+        if not conversation.can_access(current_user.id):
             raise HTTPException(status_code=403, detail="Access denied")
         
         # Get feedback
@@ -8,6 +8,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 from app.api.deps import get_current_user
+from app.api.responses import PydanticJSONResponse
 from app.models.user import User, UserTier
 from app.agents.knowledge import VexelKnowledgeManager
 from app.agents.cross_file_knowledge import VexelCrossFileKnowledge
@@ -732,7 +733,9 @@ async def get_performance_dashboard(
         dashboard_data["user_tier"] = str(user_tier)
         dashboard_data["access_level"] = "full" if user_tier == UserTier.ENTERPRISE else "limited"
 
-        return dashboard_data
+        # Insight dataclasses and datetimes are encoded directly by pydantic-core,
+        # skipping the jsonable_encoder walk of the whole dashboard
+        return PydanticJSONResponse(dashboard_data)
 
     except HTTPException:
         raise
@@ -767,7 +770,8 @@ async def get_admin_dashboard(
         dashboard_data = get_admin_dashboard()
         dashboard_data["admin_user"] = str(current_user.id)
 
-        return dashboard_data
+        # Already JSON-compatible; render it directly instead of re-validating the nested dict
+        return PydanticJSONResponse(dashboard_data)
 
     except HTTPException:
         raise
@@ -811,16 +815,16 @@ async def update_user_tier(
             )
 
         # Update user tier
-        from app.services.admin_service import admin_service
+        from app.services.admin_service import get_admin_service
 
-        result = admin_service.upgrade_user_tier(
+        result = get_admin_service().upgrade_user_tier(
             user_id=request.user_id,
             new_tier=new_tier,
             admin_id=str(current_user.id),
             reason=request.reason
         )
 
-        return result
+        return PydanticJSONResponse(result)
 
     except HTTPException:
         raise
@@ -848,11 +852,11 @@ async def get_system_health(
             )
 
         # Get system health
-        from app.services.admin_service import admin_service
+        from app.services.admin_service import get_admin_service
 
-        health_data = admin_service.get_system_health()
+        health_data = get_admin_service().get_system_health()
 
-        return health_data
+        return PydanticJSONResponse(health_data)
 
     except HTTPException:
         raise
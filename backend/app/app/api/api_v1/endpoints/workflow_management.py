@@ -4,11 +4,11 @@ Endpoints for managing workflow templates, executions, and schedules
 """
 
 from typing import Any, List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks, Response
 from motor.core import AgnosticDatabase
 from odmantic import ObjectId
 
-from app.api.deps import get_current_user, get_database
+from app.api.deps import get_current_user, get_database, json_body, json_body_openapi
 from app.models.user import User
 from app.models.workflow import (
     WorkflowTemplate, WorkflowExecution, WorkflowStepExecution, 
@@ -31,6 +31,7 @@ from app.schemas.workflow import (
     WorkflowExecutionListResponse,
     WorkflowSearchRequest
 )
+from app.schemas.base_schema import validate_rows
 from app.crud import (
     crud_workflow_template,
     crud_workflow_execution,
@@ -105,21 +106,24 @@ async def list_workflow_templates(
         paginated_templates = templates[start_idx:end_idx]
         
         # Convert to response format
-        template_responses = [
-            WorkflowTemplateResponse(
-                id=str(template.id),
-                user_id=str(template.user_id),
-                shared_with=[str(uid) for uid in template.shared_with],
-                **template.model_dump(exclude={"id", "user_id", "shared_with"})
+        template_responses = validate_rows(
+            WorkflowTemplateResponse,
+            (
+                {
+                    "id": str(template.id),
+                    "user_id": str(template.user_id),
+                    "shared_with": [str(uid) for uid in template.shared_with],
+                    **template.model_dump(exclude={"id", "user_id", "shared_with"})
+                }
+                for template in paginated_templates
             )
-            for template in paginated_templates
-        ]
+        )
         
-        return WorkflowListResponse(
-            templates=template_responses,
-            total=len(templates),
-            page=page,
-            page_size=page_size
+        return Response(
+            content=WorkflowListResponse.render_json(
+                template_responses, total=len(templates), page=page, page_size=page_size
+            ),
+            media_type="application/json"
         )
         
     except Exception as e:
@@ -142,9 +146,7 @@ async def get_workflow_template(
             raise HTTPException(status_code=404, detail="Workflow template not found")
         
         # Check if user has access
-        if (template.user_id != current_user.id and 
-            current_user.id not in template.shared_with and 
-            not template.is_public):
+        if not template.can_access(current_user.id):
             raise HTTPException(status_code=403, detail="Access denied")
         
         return WorkflowTemplateResponse(
@@ -232,11 +234,15 @@ async def delete_workflow_template(
 # WORKFLOW EXECUTION ENDPOINTS
 # ============================================================================
 
-@router.post("/execute", response_model=WorkflowExecuteResponse)
+@router.post(
+    "/execute",
+    response_model=WorkflowExecuteResponse,
+    openapi_extra=json_body_openapi(WorkflowExecuteRequest)
+)
 async def execute_workflow(
     *,
     db: AgnosticDatabase = Depends(get_database),
-    execute_request: WorkflowExecuteRequest,
+    execute_request: WorkflowExecuteRequest = Depends(json_body(WorkflowExecuteRequest)),
     current_user: User = Depends(get_current_user),
     background_tasks: BackgroundTasks
 ):
@@ -266,9 +272,7 @@ async def execute_workflow(
                 raise HTTPException(status_code=404, detail="Workflow template not found")
             
             # Check access
-            if (template.user_id != current_user.id and 
-                current_user.id not in template.shared_with and 
-                not template.is_public):
+            if not template.can_access(current_user.id):
                 raise HTTPException(status_code=403, detail="Access denied to template")
             
             execution_data["workflow_template_id"] = template.id
@@ -376,21 +380,26 @@ async def list_workflow_executions(
         paginated_executions = executions[start_idx:end_idx]
         
         # Convert to response format
-        execution_responses = [
-            WorkflowExecutionResponse(
-                id=str(execution.id),
-                workflow_template_id=str(execution.workflow_template_id) if execution.workflow_template_id else None,
-                user_id=str(execution.user_id),
-                **execution.model_dump(exclude={"id", "workflow_template_id", "user_id"})
+        execution_responses = validate_rows(
+            WorkflowExecutionResponse,
+            (
+                {
+                    "id": str(execution.id),
+                    "workflow_template_id": (
+                        str(execution.workflow_template_id) if execution.workflow_template_id else None
+                    ),
+                    "user_id": str(execution.user_id),
+                    **execution.model_dump(exclude={"id", "workflow_template_id", "user_id"})
+                }
+                for execution in paginated_executions
             )
-            for execution in paginated_executions
-        ]
+        )
         
-        return WorkflowExecutionListResponse(
-            executions=execution_responses,
-            total=len(executions),
-            page=page,
-            page_size=page_size
+        return Response(
+            content=WorkflowExecutionListResponse.render_json(
+                execution_responses, total=len(executions), page=page, page_size=page_size
+            ),
+            media_type="application/json"
         )
         
     except Exception as e:
@@ -416,12 +425,7 @@ async def get_workflow_execution(
         if execution.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        return WorkflowExecutionResponse(
-            id=str(execution.id),
-            workflow_template_id=str(execution.workflow_template_id) if execution.workflow_template_id else None,
-            user_id=str(execution.user_id),
-            **execution.model_dump(exclude={"id", "workflow_template_id", "user_id"})
-        )
+        return WorkflowExecutionResponse.from_model(execution)
         
     except HTTPException:
         raise
@@ -523,12 +527,12 @@ async def _execute_workflow_background(db: AgnosticDatabase, execution_id: str,
         for i, step in enumerate(execution_data["steps"]):
             await asyncio.sleep(1)  # Simulate step execution time
             
-            # Update execution progress
-            await crud_workflow_execution.update(
-                db, 
-                db_obj=await crud_workflow_execution.get_by_execution_id(db, execution_id),
-                obj_in={"current_step_index": i, "steps_completed": i + 1}
+            # Update execution progress; stop if it was cancelled or failed meanwhile
+            progressed = await crud_workflow_execution.mark_step_completed(
+                db, execution_id, step_index=i, step_id=step.step_id
             )
+            if progressed is None:
+                return
         
         # Complete execution
         duration = time.time() - start_time
@@ -0,0 +1,16 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSON response rendered by pydantic-core instead of the stdlib `json` module
+
+    Route output has already been reduced to JSON-compatible data by the response
+    model; encoding it in Rust avoids a pure-Python walk of the whole payload.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -96,6 +96,7 @@ class Settings(BaseSettings):
     METRICS_RETENTION_DAYS: int = 30
     PERFORMANCE_ALERT_THRESHOLD: float = 10.0
     MAX_METRICS_IN_MEMORY: int = 10000
+    MAX_AUDIT_LOG_ENTRIES: int = 10000
 
     # User Tier Limits
     FREE_TIER_MONTHLY_LIMIT: int = 50
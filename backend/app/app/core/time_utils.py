@@ -0,0 +1,8 @@
+from datetime import datetime
+from time import time
+
+
+def datetime_now_sec() -> datetime:
+    """Current local time truncated to whole seconds"""
+    # Truncating the epoch seconds skips building a datetime only to replace its microseconds
+    return datetime.fromtimestamp(int(time()))
@@ -5,10 +5,12 @@ CRUD operations for Agent models
 from typing import Any, Dict, List, Optional, Literal
 from datetime import datetime
 from motor.core import AgnosticDatabase
-from odmantic import ObjectId, Model, Field
+from odmantic import ObjectId, Model, Field, Index
 from pydantic import BaseModel, ConfigDict
 
+from app.core.time_utils import datetime_now_sec
 from app.crud.base import CRUDBase
+from app.schema_types import StoredTagList
 from app.models.agent_enums import (
     AgentStatus,
     AgentType
@@ -16,9 +18,6 @@ from app.models.agent_enums import (
 
 # Simple model definitions for CRUD operations
 
-def datetime_now_sec():
-    return datetime.now().replace(microsecond=0)
-
 class KnowledgeSource(Model):
     """Knowledge source configuration"""
     type: str = "collection"  # Default to collection type
@@ -57,7 +56,7 @@ class AgentConfiguration(Model):
     })
 
     # Agent Capabilities
-    capabilities: List[str] = Field(default_factory=list)
+    capabilities: StoredTagList = Field(default_factory=list)
     instructions: List[str] = Field(default_factory=list)
     knowledge_sources: List[KnowledgeSource] = Field(default_factory=list)
 
@@ -84,7 +83,7 @@ class AgentConfiguration(Model):
     # Status and Metadata
     status: AgentStatus = Field(default=AgentStatus.ACTIVE)
     version: str = Field(default="1.0.0")
-    tags: List[str] = Field(default_factory=list)
+    tags: StoredTagList = Field(default_factory=list)
 
     # Performance Metrics
     total_conversations: int = Field(default=0)
@@ -97,6 +96,10 @@ class AgentConfiguration(Model):
     created: datetime = Field(default_factory=datetime_now_sec)
     updated: datetime = Field(default_factory=datetime_now_sec)
 
+    def can_access(self, user_id: ObjectId) -> bool:
+        """Check whether a user may use this agent"""
+        return user_id == self.user_id or self.is_public or user_id in self.shared_with
+
 class AgentSession(Model):
     """Agent session model"""
     agent_id: ObjectId = Field(...)
@@ -132,6 +135,10 @@ class AgentMetrics(Model):
     date: datetime = Field(default_factory=lambda: datetime.now().replace(hour=0, minute=0, second=0, microsecond=0))
     created: datetime = Field(default_factory=datetime_now_sec)
 
+    model_config = {
+        "indexes": lambda: [Index(AgentMetrics.agent_id, AgentMetrics.date)]
+    }
+
 
 # Import schemas from schemas module to avoid duplication
 from app.schemas.agent import AgentConfigurationCreate, AgentConfigurationUpdate
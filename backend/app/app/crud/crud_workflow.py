@@ -2,11 +2,13 @@
 CRUD operations for Workflow models
 """
 
+import logging
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 from motor.core import AgnosticDatabase
 from odmantic import ObjectId
 from pydantic import BaseModel
+from pymongo import ReturnDocument
 
 from app.crud.base import CRUDBase
 from app.models.workflow import (
@@ -17,9 +19,15 @@ from app.models.workflow import (
     WorkflowAnalytics,
     WorkflowStepConfig,
     WorkflowStatus,
+    STEP_ID_PATTERN,
     StepType
 )
 
+logger = logging.getLogger(__name__)
+
+# An execution is folded into WorkflowAnalytics once, on its first move into one of these
+_FINISHED_STATUSES = frozenset({WorkflowStatus.COMPLETED, WorkflowStatus.FAILED, WorkflowStatus.CANCELLED})
+
 
 # Pydantic schemas for CRUD operations
 class WorkflowTemplateCreate(BaseModel):
@@ -232,6 +240,44 @@ class CRUDWorkflowExecution(CRUDBase[WorkflowExecution, WorkflowExecutionCreate,
             return await self.engine.save(execution)
         return execution
     
+    async def mark_step_completed(
+        self,
+        db: AgnosticDatabase,
+        execution_id: str,
+        step_index: int,
+        step_id: str,
+        result: Any = None
+    ) -> Optional[WorkflowExecution]:
+        """
+        Record step progress on a running execution
+
+        All progress fields are written by one atomic update instead of
+        assigning them on the model and saving the whole document. Executions
+        that already finished (e.g. cancelled while a step ran) are left as they
+        are, and None is returned.
+        """
+        fields: Dict[str, Any] = {
+            "current_step_index": step_index,
+            "current_step_id": step_id,
+            "steps_completed": step_index + 1,
+            "last_activity": datetime.now().replace(microsecond=0),
+        }
+        if result is not None:
+            if STEP_ID_PATTERN.match(step_id):
+                fields[f"step_results.{step_id}"] = result
+            else:
+                logger.warning("Not storing result of step %r: id is not a valid field name", step_id)
+
+        doc = await self.engine.get_collection(WorkflowExecution).find_one_and_update(
+            {
+                "execution_id": execution_id,
+                "status": {"$in": [WorkflowStatus.PENDING.value, WorkflowStatus.RUNNING.value]},
+            },
+            {"$set": fields},
+            return_document=ReturnDocument.AFTER
+        )
+        return WorkflowExecution.model_validate_doc(doc) if doc else None
+    
     async def complete_execution(
         self, 
         db: AgnosticDatabase, 
@@ -242,11 +288,14 @@ class CRUDWorkflowExecution(CRUDBase[WorkflowExecution, WorkflowExecutionCreate,
         """Complete a workflow execution"""
         execution = await self.get_by_execution_id(db, execution_id)
         if execution:
+            already_finished = execution.status in _FINISHED_STATUSES
             execution.status = WorkflowStatus.COMPLETED
             execution.completed_at = datetime.now().replace(microsecond=0)
             execution.final_result = final_result
             execution.total_duration = total_duration
-            return await self.engine.save(execution)
+            execution = await self.engine.save(execution)
+            if not already_finished:
+                await crud_workflow_analytics.record_execution(db, execution)
         return execution
     
     async def fail_execution(
@@ -258,10 +307,13 @@ class CRUDWorkflowExecution(CRUDBase[WorkflowExecution, WorkflowExecutionCreate,
         """Fail a workflow execution"""
         execution = await self.get_by_execution_id(db, execution_id)
         if execution:
+            already_finished = execution.status in _FINISHED_STATUSES
             execution.status = WorkflowStatus.FAILED
             execution.completed_at = datetime.now().replace(microsecond=0)
             execution.error_details = error_details
-            return await self.engine.save(execution)
+            execution = await self.engine.save(execution)
+            if not already_finished:
+                await crud_workflow_analytics.record_execution(db, execution)
         return execution
 
 
@@ -301,6 +353,7 @@ class CRUDWorkflowStepExecution(CRUDBase[WorkflowStepExecution, WorkflowStepExec
         """Update step execution status"""
         step_execution = await self.get(db, step_execution_id)
         if step_execution:
+            already_finished = step_execution.status in _FINISHED_STATUSES
             step_execution.status = status
             if output_data is not None:
                 step_execution.output_data = output_data
@@ -309,12 +362,17 @@ class CRUDWorkflowStepExecution(CRUDBase[WorkflowStepExecution, WorkflowStepExec
             if execution_time > 0:
                 step_execution.execution_time = execution_time
             
-            if status in [WorkflowStatus.COMPLETED, WorkflowStatus.FAILED]:
+            finished = status in [WorkflowStatus.COMPLETED, WorkflowStatus.FAILED]
+            if finished:
                 step_execution.completed_at = datetime.now().replace(microsecond=0)
             elif status == WorkflowStatus.RUNNING:
                 step_execution.started_at = datetime.now().replace(microsecond=0)
             
-            return await self.engine.save(step_execution)
+            step_execution = await self.engine.save(step_execution)
+            if finished and not already_finished:
+                execution = await crud_workflow_execution.get(db, step_execution.execution_id)
+                if execution:
+                    await crud_workflow_analytics.record_step_execution(db, execution, step_execution)
         return step_execution
 
 
@@ -361,6 +419,20 @@ class CRUDWorkflowSchedule(CRUDBase[WorkflowSchedule, WorkflowScheduleCreate, Ba
         return schedule
 
 
+def _incremented(field: str, amount: float) -> Dict[str, Any]:
+    """Aggregation expression adding `amount` to a field that may not exist yet"""
+    return {"$add": [{"$ifNull": [f"${field}", 0]}, amount]}
+
+
+def _analytics_key(execution: WorkflowExecution) -> Dict[str, Any]:
+    """Filter selecting the analytics document an execution is folded into"""
+    return {
+        "workflow_template_id": execution.workflow_template_id,
+        "user_id": execution.user_id,
+        "date": execution.created.replace(hour=0, minute=0, second=0, microsecond=0),
+    }
+
+
 class CRUDWorkflowAnalytics(CRUDBase[WorkflowAnalytics, BaseModel, BaseModel]):
     """CRUD operations for WorkflowAnalytics"""
     
@@ -394,6 +466,83 @@ class CRUDWorkflowAnalytics(CRUDBase[WorkflowAnalytics, BaseModel, BaseModel]):
             sort=WorkflowAnalytics.date.asc()
         )
 
+    async def record_execution(self, db: AgnosticDatabase, execution: WorkflowExecution) -> None:
+        """
+        Fold a finished execution into its day's analytics document.
+
+        Counters and running sums are maintained at write time with a single
+        upsert, so reading analytics is a plain find_one instead of an
+        aggregation over every execution.
+        """
+        duration = execution.total_duration
+        status = execution.status
+
+        # Evaluated against the document as it was before this update
+        has_executions = {"$gt": [{"$ifNull": ["$total_executions", 0]}, 0]}
+
+        pipeline = [
+            {"$set": {
+                "total_executions": _incremented("total_executions", 1),
+                "successful_executions": _incremented(
+                    "successful_executions", int(status == WorkflowStatus.COMPLETED)
+                ),
+                "failed_executions": _incremented("failed_executions", int(status == WorkflowStatus.FAILED)),
+                "cancelled_executions": _incremented(
+                    "cancelled_executions", int(status == WorkflowStatus.CANCELLED)
+                ),
+                "sum_duration": _incremented("sum_duration", duration),
+                "sum_sq_duration": _incremented("sum_sq_duration", duration * duration),
+                "total_cost": _incremented("total_cost", execution.total_cost),
+                "min_duration": {"$cond": [has_executions, {"$min": ["$min_duration", duration]}, duration]},
+                "max_duration": {"$cond": [has_executions, {"$max": ["$max_duration", duration]}, duration]},
+                "created": {"$ifNull": ["$created", datetime.now().replace(microsecond=0)]},
+            }},
+            {"$set": {"average_duration": {"$divide": ["$sum_duration", "$total_executions"]}}},
+        ]
+
+        await self.engine.get_collection(WorkflowAnalytics).update_one(
+            _analytics_key(execution), pipeline, upsert=True
+        )
+
+    async def record_step_execution(
+        self,
+        db: AgnosticDatabase,
+        execution: WorkflowExecution,
+        step_execution: WorkflowStepExecution
+    ) -> None:
+        """
+        Fold a finished step into the per-step success rate and duration maps.
+
+        The running averages are recomputed inside a single pipeline update from
+        the stored per-step count, so there is no read-modify-write round trip.
+        """
+        step_id = step_execution.step_id
+        if not STEP_ID_PATTERN.match(step_id):
+            # Stored before step ids were constrained; it cannot be used as a field path
+            logger.warning("Skipping analytics for step %r: id is not a valid field name", step_id)
+            return
+        succeeded = 100.0 if step_execution.status == WorkflowStatus.COMPLETED else 0.0
+        count = {"$ifNull": [f"$step_execution_counts.{step_id}", 0]}
+
+        def running_average(field: str, value: float) -> Dict[str, Any]:
+            previous_total = {"$multiply": [{"$ifNull": [f"${field}.{step_id}", 0]}, count]}
+            return {"$divide": [{"$add": [previous_total, value]}, {"$add": [count, 1]}]}
+
+        pipeline = [
+            {"$set": {
+                f"step_success_rates.{step_id}": running_average("step_success_rates", succeeded),
+                f"step_average_durations.{step_id}": running_average(
+                    "step_average_durations", step_execution.execution_time
+                ),
+                f"step_execution_counts.{step_id}": {"$add": [count, 1]},
+                "created": {"$ifNull": ["$created", datetime.now().replace(microsecond=0)]},
+            }},
+        ]
+
+        await self.engine.get_collection(WorkflowAnalytics).update_one(
+            _analytics_key(execution), pipeline, upsert=True
+        )
+
 
 # Create CRUD instances
 crud_workflow_template = CRUDWorkflowTemplate(WorkflowTemplate)
@@ -2,9 +2,23 @@ from pymongo.database import Database
 
 from app import crud, schemas
 from app.core.config import settings
+from app.crud.crud_agent import AgentMetrics
+from app.db.session import get_engine
+from app.models.workflow import (
+    WorkflowTemplate,
+    WorkflowExecution,
+    WorkflowStepExecution,
+    WorkflowSchedule,
+    WorkflowAnalytics,
+)
 
 
 async def init_db(db: Database) -> None:
+    # Create the indexes declared in the models' model_config
+    await get_engine().configure_database(
+        [WorkflowTemplate, WorkflowExecution, WorkflowStepExecution, WorkflowSchedule, WorkflowAnalytics, AgentMetrics]
+    )
+
     user = await crud.user.get_by_email(db, email=settings.FIRST_SUPERUSER)
     if not user:
         # Create user auth
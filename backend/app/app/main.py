@@ -5,6 +5,8 @@ import time
 import logging
 
 from app.api.api_v1.api import api_router
+from app.api.deps import add_json_body_schemas
+from app.api.responses import PydanticJSONResponse
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -33,6 +35,7 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=PydanticJSONResponse,
     lifespan=lifespan
 )
 
@@ -82,6 +85,16 @@ async def performance_monitoring_middleware(request: Request, call_next):
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+
+def custom_openapi():
+    """Generate the OpenAPI document once, adding the bodies parsed by `json_body`"""
+    if app.openapi_schema is None:
+        add_json_body_schemas(FastAPI.openapi(app))
+    return app.openapi_schema
+
+
+app.openapi = custom_openapi
+
 # Set all CORS enabled origins
 app.add_middleware(
     CORSMiddleware,
@@ -8,15 +8,28 @@ from typing import TYPE_CHECKING, Any, Optional, List, Dict, Literal
 from datetime import datetime
 from enum import Enum
 from pydantic import validator, ConfigDict
-from odmantic import ObjectId, Field, Model
+from odmantic import ObjectId, Field, Model, Index
+
+from app.core.time_utils import datetime_now_sec
+from app.schema_types import StoredTagList
 
 if TYPE_CHECKING:
     from .user import User
     from .chat import ChatSession
 
 
-def datetime_now_sec():
-    return datetime.now().replace(microsecond=0)
+# Defaults shared with the agent API schemas; each instance gets its own copy
+DEFAULT_MODEL_PARAMETERS: Dict[str, Any] = {"temperature": 0.7, "max_tokens": 1000}
+
+DEFAULT_INSTRUCTIONS: tuple[str, ...] = (
+    "You are a helpful AI assistant. Follow these critical guidelines:",
+    "1. NEVER fabricate or invent information about specific systems, architectures, or technical details",
+    "2. If you don't have access to knowledge sources about a topic, clearly state this limitation",
+    "3. Distinguish between general knowledge and specific system knowledge",
+    "4. When asked about specific projects or systems, only provide information if you have verified knowledge sources",
+    "5. If uncertain about any information, express your uncertainty rather than guessing",
+    "6. Always prioritize accuracy over completeness - it's better to say 'I don't know' than to provide incorrect information"
+)
 
 
 class AgentStatus(str, Enum):
@@ -67,10 +80,7 @@ class AgentConfiguration(Model):
     # Model Configuration
     ai_model_provider: str = Field(default="gemini")
     ai_model_id: str = Field(default="gemini/gemini-2.5-flash-lite")
-    ai_model_parameters: Dict[str, Any] = Field(default_factory=lambda: {
-        "temperature": 0.7,
-        "max_tokens": 1000
-    })
+    ai_model_parameters: Dict[str, Any] = Field(default_factory=lambda: DEFAULT_MODEL_PARAMETERS.copy())
 
     # API Keys Configuration - stored encrypted in database
     api_keys: Optional[Dict[str, str]] = Field(default_factory=dict)
@@ -83,18 +93,8 @@ class AgentConfiguration(Model):
     })
     
     # Agent Capabilities
-    capabilities: List[str] = Field(default_factory=list)
-    instructions: List[str] = Field(
-        default_factory=lambda: [
-            "You are a helpful AI assistant. Follow these critical guidelines:",
-            "1. NEVER fabricate or invent information about specific systems, architectures, or technical details",
-            "2. If you don't have access to knowledge sources about a topic, clearly state this limitation",
-            "3. Distinguish between general knowledge and specific system knowledge",
-            "4. When asked about specific projects or systems, only provide information if you have verified knowledge sources",
-            "5. If uncertain about any information, express your uncertainty rather than guessing",
-            "6. Always prioritize accuracy over completeness - it's better to say 'I don't know' than to provide incorrect information"
-        ]
-    )
+    capabilities: StoredTagList = Field(default_factory=list)
+    instructions: List[str] = Field(default_factory=lambda: list(DEFAULT_INSTRUCTIONS))
     tools: List[ToolConfiguration] = Field(default_factory=list)
     knowledge_sources: List[KnowledgeSource] = Field(default_factory=list)
     
@@ -121,7 +121,7 @@ class AgentConfiguration(Model):
     # Status and Metadata
     status: AgentStatus = Field(default=AgentStatus.ACTIVE)
     version: str = Field(default="1.0.0")
-    tags: List[str] = Field(default_factory=list)
+    tags: StoredTagList = Field(default_factory=list)
     
     # Performance Metrics
     total_conversations: int = Field(default=0)
@@ -140,6 +140,10 @@ class AgentConfiguration(Model):
             raise ValueError('Agent name cannot be empty')
         return v.strip()
 
+    def can_access(self, user_id: ObjectId) -> bool:
+        """Check whether a user may use this agent"""
+        return user_id == self.user_id or self.is_public or user_id in self.shared_with
+
 
     
     @validator('ai_model_parameters')
@@ -210,3 +214,7 @@ class AgentMetrics(Model):
     # Date tracking
     date: datetime = Field(default_factory=lambda: datetime.now().replace(hour=0, minute=0, second=0, microsecond=0))
     created: datetime = Field(default_factory=datetime_now_sec)
+
+    model_config = {
+        "indexes": lambda: [Index(AgentMetrics.agent_id, AgentMetrics.date)]
+    }
@@ -10,17 +10,15 @@ from enum import Enum
 from pydantic import validator, ConfigDict
 from odmantic import ObjectId, Field
 
+from app.core.time_utils import datetime_now_sec
 from app.db.base_class import Base
+from app.schema_types import RawDict
 
 if TYPE_CHECKING:
     from .user import User
     from .agent import AgentConfiguration
 
 
-def datetime_now_sec():
-    return datetime.now().replace(microsecond=0)
-
-
 class MessageRole(str, Enum):
     """Message roles in conversation"""
     USER = "user"
@@ -95,13 +93,13 @@ class Message(Base):
     ai_model_used: Optional[str] = Field(default=None)
     
     # Context and Memory
-    context_used: Dict[str, Any] = Field(default_factory=dict)
-    memory_operations: List[Dict[str, Any]] = Field(default_factory=list)
-    knowledge_searches: List[Dict[str, Any]] = Field(default_factory=list)
+    context_used: RawDict = Field(default_factory=dict)
+    memory_operations: List[RawDict] = Field(default_factory=list)
+    knowledge_searches: List[RawDict] = Field(default_factory=list)
     
     # Message Status
     is_edited: bool = Field(default=False)
-    edit_history: List[Dict[str, Any]] = Field(default_factory=list)
+    edit_history: List[RawDict] = Field(default_factory=list)
     is_deleted: bool = Field(default=False)
     
     # Timestamps
@@ -132,8 +130,8 @@ class ChatConversation(Base):
     agent_session_id: Optional[str] = Field(default=None)  # Runtime session ID
     
     # Conversation Configuration
-    agent_config_snapshot: Dict[str, Any] = Field(default_factory=dict)  # Agent config at conversation start
-    conversation_settings: Dict[str, Any] = Field(default_factory=dict)
+    agent_config_snapshot: RawDict = Field(default_factory=dict)  # Agent config at conversation start
+    conversation_settings: RawDict = Field(default_factory=dict)
     
     # Conversation State
     status: ConversationStatus = Field(default=ConversationStatus.ACTIVE)
@@ -148,7 +146,7 @@ class ChatConversation(Base):
     average_response_time: float = Field(default=0.0)
     
     # Context and Memory
-    conversation_context: Dict[str, Any] = Field(default_factory=dict)
+    conversation_context: RawDict = Field(default_factory=dict)
     conversation_summary: str = Field(default="")
     key_topics: List[str] = Field(default_factory=list)
     
@@ -163,6 +161,10 @@ class ChatConversation(Base):
         if len(v) > 200:
             raise ValueError('Title too long')
         return v.strip() if v else "New Conversation"
+
+    def can_access(self, user_id: ObjectId) -> bool:
+        """Check whether a user may view this conversation"""
+        return user_id == self.user_id or self.is_shared or user_id in self.shared_with
     
 
 
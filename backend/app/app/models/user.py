@@ -1,20 +1,18 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Mapping, Optional
 from datetime import datetime
 from enum import Enum
+from types import MappingProxyType
 from pydantic import EmailStr
 from odmantic import ObjectId, Field
 
+from app.core.time_utils import datetime_now_sec
 from app.db.base_class import Base
 
 if TYPE_CHECKING:
     from . import Token  # noqa: F401
 
 
-def datetime_now_sec():
-    return datetime.now().replace(microsecond=0)
-
-
 class UserTier(str, Enum):
     """User subscription tier enumeration"""
     FREE = "free"
@@ -22,6 +20,43 @@ class UserTier(str, Enum):
     ENTERPRISE = "enterprise"
 
 
+def _with_byte_limits(limits: dict) -> Mapping[str, Any]:
+    """Add the byte thresholds can_upload compares against, so they are derived once at import"""
+    return MappingProxyType({
+        **limits,
+        "max_file_size_bytes": limits["max_file_size_mb"] * 1024 * 1024,
+        "max_storage_bytes": limits["max_storage_gb"] * 1024 * 1024 * 1024,
+    })
+
+
+_TIER_LIMITS = {
+    UserTier.FREE: _with_byte_limits({
+        "max_monthly_uploads": 50,
+        "max_file_size_mb": 10,
+        "max_storage_gb": 1,
+        "chunking_strategies": ["auto", "fixed", "recursive", "document"],
+        "parallel_processing": False,
+        "analytics": False
+    }),
+    UserTier.PREMIUM: _with_byte_limits({
+        "max_monthly_uploads": 500,
+        "max_file_size_mb": 50,
+        "max_storage_gb": 10,
+        "chunking_strategies": ["auto", "fixed", "recursive", "document", "semantic", "markdown"],
+        "parallel_processing": True,
+        "analytics": True
+    }),
+    UserTier.ENTERPRISE: _with_byte_limits({
+        "max_monthly_uploads": -1,  # Unlimited
+        "max_file_size_mb": 100,
+        "max_storage_gb": 100,
+        "chunking_strategies": ["auto", "fixed", "recursive", "document", "semantic", "agentic", "markdown"],
+        "parallel_processing": True,
+        "analytics": True
+    }),
+}
+
+
 class User(Base):
     created: datetime = Field(default_factory=datetime_now_sec)
     modified: datetime = Field(default_factory=datetime_now_sec)
@@ -49,35 +84,9 @@ class User(Base):
     parallel_processing_enabled: bool = Field(default=False, description="Access to parallel document processing")
     analytics_enabled: bool = Field(default=False, description="Access to processing analytics")
 
-    def get_tier_limits(self) -> dict:
-        """Get limits based on user tier"""
-        tier_limits = {
-            UserTier.FREE: {
-                "max_monthly_uploads": 50,
-                "max_file_size_mb": 10,
-                "max_storage_gb": 1,
-                "chunking_strategies": ["auto", "fixed", "recursive", "document"],
-                "parallel_processing": False,
-                "analytics": False
-            },
-            UserTier.PREMIUM: {
-                "max_monthly_uploads": 500,
-                "max_file_size_mb": 50,
-                "max_storage_gb": 10,
-                "chunking_strategies": ["auto", "fixed", "recursive", "document", "semantic", "markdown"],
-                "parallel_processing": True,
-                "analytics": True
-            },
-            UserTier.ENTERPRISE: {
-                "max_monthly_uploads": -1,  # Unlimited
-                "max_file_size_mb": 100,
-                "max_storage_gb": 100,
-                "chunking_strategies": ["auto", "fixed", "recursive", "document", "semantic", "agentic", "markdown"],
-                "parallel_processing": True,
-                "analytics": True
-            }
-        }
-        return tier_limits.get(self.tier, tier_limits[UserTier.FREE])
+    def get_tier_limits(self) -> Mapping[str, Any]:
+        """Get limits based on user tier; the mapping is shared between users and read-only"""
+        return _TIER_LIMITS.get(self.tier, _TIER_LIMITS[UserTier.FREE])
 
     def can_upload(self, file_size_bytes: int) -> tuple[bool, str]:
         """Check if user can upload a file of given size"""
@@ -88,13 +97,11 @@ class User(Base):
             return False, f"Monthly upload limit of {limits['max_monthly_uploads']} reached"
 
         # Check file size limit
-        max_file_size_bytes = limits["max_file_size_mb"] * 1024 * 1024
-        if file_size_bytes > max_file_size_bytes:
+        if file_size_bytes > limits["max_file_size_bytes"]:
             return False, f"File size exceeds limit of {limits['max_file_size_mb']}MB"
 
         # Check storage limit
-        max_storage_bytes = limits["max_storage_gb"] * 1024 * 1024 * 1024
-        if self.total_storage_bytes + file_size_bytes > max_storage_bytes:
+        if self.total_storage_bytes + file_size_bytes > limits["max_storage_bytes"]:
             return False, f"Storage limit of {limits['max_storage_gb']}GB would be exceeded"
 
         return True, "Upload allowed"
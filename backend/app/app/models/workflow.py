@@ -4,21 +4,26 @@ ODMantic models for storing workflow configurations, executions, and results
 """
 
 from __future__ import annotations
+import re
 from typing import TYPE_CHECKING, Any, Optional, List, Dict, Literal
 from datetime import datetime
 from enum import Enum
 from pydantic import validator
-from odmantic import ObjectId, Field
+from odmantic import ObjectId, Field, Index, EmbeddedModel
+from odmantic.query import desc
 
 from app.db.base_class import Base
+from app.core.time_utils import datetime_now_sec
+from app.schema_types import RawDict, StoredTagList
 
 if TYPE_CHECKING:
     from .user import User
     from .agent import AgentConfiguration
 
 
-def datetime_now_sec():
-    return datetime.now().replace(microsecond=0)
+# Step ids that are safe as field names in step_results and the WorkflowAnalytics
+# step maps: no "." and no leading "$"
+STEP_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
 
 
 class WorkflowStatus(str, Enum):
@@ -42,17 +47,17 @@ class StepType(str, Enum):
     NOTIFICATION = "notification"
 
 
-class WorkflowStepConfig(Base):
-    """Configuration for individual workflow steps"""
+class WorkflowStepConfig(EmbeddedModel):
+    """Configuration for individual workflow steps, embedded in templates and executions"""
     step_id: str = Field(...)
     name: str = Field(...)
     step_type: StepType = Field(...)
     
     # Step Configuration
-    config: Dict[str, Any] = Field(default_factory=dict)
-    conditions: List[Dict[str, Any]] = Field(default_factory=list)
+    config: RawDict = Field(default_factory=dict)
+    conditions: List[RawDict] = Field(default_factory=list)
     next_steps: List[str] = Field(default_factory=list)
-    error_handling: Dict[str, Any] = Field(default_factory=dict)
+    error_handling: RawDict = Field(default_factory=dict)
     
     # Step Metadata
     description: str = Field(default="")
@@ -76,12 +81,12 @@ class WorkflowTemplate(Base):
     
     # Workflow Configuration
     steps: List[WorkflowStepConfig] = Field(default_factory=list)
-    global_config: Dict[str, Any] = Field(default_factory=dict)
-    input_schema: Dict[str, Any] = Field(default_factory=dict)
-    output_schema: Dict[str, Any] = Field(default_factory=dict)
+    global_config: RawDict = Field(default_factory=dict)
+    input_schema: RawDict = Field(default_factory=dict)
+    output_schema: RawDict = Field(default_factory=dict)
     
     # Template Metadata
-    tags: List[str] = Field(default_factory=list)
+    tags: StoredTagList = Field(default_factory=list)
     estimated_duration: int = Field(default=0)  # in seconds
     complexity_level: Literal["simple", "medium", "complex"] = Field(default="medium")
     
@@ -105,7 +110,18 @@ class WorkflowTemplate(Base):
         if not v or not v.strip():
             raise ValueError('Workflow name cannot be empty')
         return v.strip()
-    
+
+    def can_access(self, user_id: ObjectId) -> bool:
+        """Check read access; the shared_with scan only runs for non-owners of private templates"""
+        return user_id == self.user_id or self.is_public or user_id in self.shared_with
+    
+    model_config = {
+        "indexes": lambda: [
+            Index(WorkflowTemplate.user_id, desc(WorkflowTemplate.updated)),
+            Index(WorkflowTemplate.is_public, WorkflowTemplate.category),
+        ]
+    }
+
 
 class WorkflowExecution(Base):
     """
@@ -119,11 +135,11 @@ class WorkflowExecution(Base):
     # Execution Context
     user_id: ObjectId = Field(...)
     session_id: str = Field(...)
-    input_parameters: Dict[str, Any] = Field(default_factory=dict)
+    input_parameters: RawDict = Field(default_factory=dict)
     
     # Execution Configuration
     steps: List[WorkflowStepConfig] = Field(default_factory=list)
-    global_config: Dict[str, Any] = Field(default_factory=dict)
+    global_config: RawDict = Field(default_factory=dict)
     
     # Execution State
     status: WorkflowStatus = Field(default=WorkflowStatus.PENDING)
@@ -131,9 +147,9 @@ class WorkflowExecution(Base):
     current_step_id: Optional[str] = Field(default=None)
     
     # Execution Results
-    step_results: Dict[str, Any] = Field(default_factory=dict)  # step_id: result
+    step_results: RawDict = Field(default_factory=dict)  # step_id: result
     final_result: Optional[Any] = Field(default=None)
-    error_details: Optional[Dict[str, Any]] = Field(default=None)
+    error_details: Optional[RawDict] = Field(default=None)
     
     # Performance Metrics
     total_duration: float = Field(default=0.0)  # in seconds
@@ -147,6 +163,15 @@ class WorkflowExecution(Base):
     completed_at: Optional[datetime] = Field(default=None)
     last_activity: datetime = Field(default_factory=datetime_now_sec)
     
+    model_config = {
+        "indexes": lambda: [
+            Index(WorkflowExecution.execution_id, unique=True),
+            Index(WorkflowExecution.user_id, desc(WorkflowExecution.created)),
+            Index(WorkflowExecution.user_id, WorkflowExecution.status, desc(WorkflowExecution.created)),
+            Index(WorkflowExecution.workflow_template_id, desc(WorkflowExecution.created)),
+        ]
+    }
+
 
 class WorkflowStepExecution(Base):
     """
@@ -159,8 +184,8 @@ class WorkflowStepExecution(Base):
     step_type: StepType = Field(...)
     
     # Step Configuration
-    step_config: Dict[str, Any] = Field(default_factory=dict)
-    input_data: Dict[str, Any] = Field(default_factory=dict)
+    step_config: RawDict = Field(default_factory=dict)
+    input_data: RawDict = Field(default_factory=dict)
     
     # Step Execution State
     status: WorkflowStatus = Field(default=WorkflowStatus.PENDING)
@@ -169,7 +194,7 @@ class WorkflowStepExecution(Base):
     
     # Step Results
     output_data: Optional[Any] = Field(default=None)
-    error_details: Optional[Dict[str, Any]] = Field(default=None)
+    error_details: Optional[RawDict] = Field(default=None)
     logs: List[str] = Field(default_factory=list)
     
     # Performance Metrics
@@ -186,6 +211,13 @@ class WorkflowStepExecution(Base):
     started_at: Optional[datetime] = Field(default=None)
     completed_at: Optional[datetime] = Field(default=None)
     
+    model_config = {
+        "indexes": lambda: [
+            Index(WorkflowStepExecution.execution_id, WorkflowStepExecution.step_id),
+        ]
+    }
+
+
 class WorkflowSchedule(Base):
     """
     Scheduled workflow executions
@@ -198,7 +230,7 @@ class WorkflowSchedule(Base):
     # Schedule Configuration
     cron_expression: str = Field(...)  # Cron format for scheduling
     timezone: str = Field(default="UTC")
-    input_parameters: Dict[str, Any] = Field(default_factory=dict)
+    input_parameters: RawDict = Field(default_factory=dict)
     
     # Schedule State
     is_active: bool = Field(default=True)
@@ -214,6 +246,14 @@ class WorkflowSchedule(Base):
     created: datetime = Field(default_factory=datetime_now_sec)
     updated: datetime = Field(default_factory=datetime_now_sec)
     
+    model_config = {
+        "indexes": lambda: [
+            Index(WorkflowSchedule.is_active, WorkflowSchedule.next_execution),
+            Index(WorkflowSchedule.user_id, desc(WorkflowSchedule.created)),
+        ]
+    }
+
+
 class WorkflowAnalytics(Base):
     """
     Workflow performance analytics and metrics
@@ -235,9 +275,14 @@ class WorkflowAnalytics(Base):
     max_duration: float = Field(default=0.0)
     total_cost: float = Field(default=0.0)
     
+    # Running sums maintained at write time (see CRUDWorkflowAnalytics.record_execution)
+    sum_duration: float = Field(default=0.0)
+    sum_sq_duration: float = Field(default=0.0)
+    
     # Step Analytics
     step_success_rates: Dict[str, float] = Field(default_factory=dict)  # step_id: success_rate
     step_average_durations: Dict[str, float] = Field(default_factory=dict)  # step_id: avg_duration
+    step_execution_counts: Dict[str, int] = Field(default_factory=dict)  # step_id: finished runs
     most_failed_steps: List[str] = Field(default_factory=list)
     
     # Usage Patterns
@@ -247,4 +292,20 @@ class WorkflowAnalytics(Base):
     # Timestamps
     created: datetime = Field(default_factory=datetime_now_sec)
     
+    model_config = {
+        # Documents are created by the record_execution upsert, which only writes the
+        # aggregate fields; the per-step maps and lists fall back to their defaults
+        "parse_doc_with_default_factories": True,
+        "indexes": lambda: [
+            # One analytics document per template, user and day (see record_execution)
+            Index(
+                WorkflowAnalytics.workflow_template_id,
+                WorkflowAnalytics.user_id,
+                WorkflowAnalytics.date,
+                unique=True
+            ),
+            Index(WorkflowAnalytics.user_id, WorkflowAnalytics.date),
+        ]
+    }
+    
 
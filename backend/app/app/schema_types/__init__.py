@@ -1 +1,3 @@
 from .base_type import BaseEnum
+from .raw_type import RawDict
+from .tag_type import StoredTagList, TagList
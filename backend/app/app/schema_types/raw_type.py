@@ -0,0 +1,22 @@
+from typing import Any, Dict
+
+from pydantic import PlainValidator
+from typing_extensions import Annotated
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    """
+    Accept mappings as-is instead of re-validating every key and value
+
+    A `Dict[str, Any]` field still walks the whole payload during validation; free-form
+    blobs like step results or error details only need to be a dict.
+    """
+    if isinstance(value, dict):
+        return value
+    try:
+        return dict(value)
+    except (TypeError, ValueError):
+        raise ValueError("Input should be a valid dictionary")
+
+
+RawDict = Annotated[Dict[str, Any], PlainValidator(_as_dict, json_schema_input_type=Dict[str, Any])]
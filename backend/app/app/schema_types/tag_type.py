@@ -0,0 +1,63 @@
+from typing import Any, List
+
+from odmantic.bson import WithBsonSerializer
+from pydantic import AfterValidator, BeforeValidator
+from typing_extensions import Annotated
+
+# Separator used by the stored form; tags may not contain it
+TAG_SEPARATOR = ","
+
+
+def _split_tags(value: Any) -> Any:
+    """
+    Expand the comma-joined storage form back into a list
+
+    Lists (API payloads and documents written before tags were joined) pass through.
+    """
+    if isinstance(value, str):
+        return value.split(TAG_SEPARATOR) if value else []
+    return value
+
+
+def _normalize_stored_tags(value: Any) -> Any:
+    """
+    Split stored tags into the elements the joined form can hold
+
+    Documents written before tags were joined may hold array elements containing the
+    separator, or empty ones; they are split and dropped here so the loaded document
+    can always be saved again.
+    """
+    value = _split_tags(value)
+    if isinstance(value, (list, tuple)):
+        return [
+            part
+            for tag in value
+            for part in (tag.split(TAG_SEPARATOR) if isinstance(tag, str) else [tag])
+            if part != ""
+        ]
+    return value
+
+
+def _check_tag(value: str) -> str:
+    """Reject tags that would not survive the comma-joined storage form"""
+    if not value:
+        raise ValueError("tags must not be empty")
+    if TAG_SEPARATOR in value:
+        raise ValueError(f"tags must not contain {TAG_SEPARATOR!r}")
+    return value
+
+
+def _join_tags(value: List[str]) -> str:
+    return TAG_SEPARATOR.join(value)
+
+
+Tag = Annotated[str, AfterValidator(_check_tag)]
+
+# Schemas accept either form and always expose a list; unstorable tags are rejected
+TagList = Annotated[List[Tag], BeforeValidator(_split_tags)]
+
+# Models expose a list and persist it as a single comma-joined string. The join only
+# runs when ODMantic builds the BSON document, so model_dump still returns a list
+StoredTagList = Annotated[
+    List[str], BeforeValidator(_normalize_stored_tags), WithBsonSerializer(_join_tags)
+]
@@ -1,74 +1,107 @@
 # flake8: noqa
-from .base_schema import BaseSchema, MetadataBaseSchema, MetadataBaseCreate, MetadataBaseUpdate, MetadataBaseInDBBase
-from .msg import Msg
-from .token import (
-    RefreshTokenCreate,
-    RefreshTokenUpdate,
-    RefreshToken,
-    Token,
-    TokenPayload,
-    MagicTokenPayload,
-    WebToken,
-)
-from .user import User, UserCreate, UserInDB, UserUpdate, UserLogin
-from .emails import EmailContent, EmailValidation
-from .totp import NewTOTP, EnableTOTP
+"""
+Schemas are resolved lazily (PEP 562) so importing `app.schemas` only builds the
+Pydantic models a code path actually touches.
+"""
+import importlib
+from typing import Any
 
-# Agent schemas
-from .agent import (
-    AgentConfigurationCreate,
-    AgentConfigurationUpdate,
-    AgentConfigurationResponse,
-    AgentSessionCreate,
-    AgentSessionUpdate,
-    AgentSessionResponse,
-    AgentMetricsResponse,
-    AgentChatRequest,
-    AgentChatResponse,
-    AgentListResponse,
-    AgentSearchRequest,
-    KnowledgeSourceSchema,
-    ToolConfigurationSchema
-)
+_EXPORTS = {
+    "base_schema": (
+        "BaseSchema",
+        "MetadataBaseSchema",
+        "MetadataBaseCreate",
+        "MetadataBaseUpdate",
+        "MetadataBaseInDBBase",
+    ),
+    "msg": ("Msg",),
+    "token": (
+        "RefreshTokenCreate",
+        "RefreshTokenUpdate",
+        "RefreshToken",
+        "Token",
+        "TokenPayload",
+        "MagicTokenPayload",
+        "WebToken",
+    ),
+    "user": ("User", "UserCreate", "UserInDB", "UserUpdate", "UserLogin"),
+    "emails": ("EmailContent", "EmailValidation"),
+    "totp": ("NewTOTP", "EnableTOTP"),
+    # Agent schemas
+    "agent": (
+        "AgentConfigurationCreate",
+        "AgentConfigurationUpdate",
+        "AgentConfigurationResponse",
+        "AgentSessionCreate",
+        "AgentSessionUpdate",
+        "AgentSessionResponse",
+        "AgentMetricsResponse",
+        "AgentChatRequest",
+        "AgentChatResponse",
+        "AgentListResponse",
+        "AgentSearchRequest",
+        "KnowledgeSourceSchema",
+        "ToolConfigurationSchema",
+    ),
+    # Chat schemas
+    "chat": (
+        "ChatConversationCreate",
+        "ChatConversationUpdate",
+        "ChatConversationResponse",
+        "MessageCreate",
+        "MessageUpdate",
+        "MessageResponse",
+        "ConversationFeedbackCreate",
+        "ConversationFeedbackResponse",
+        "ConversationTemplateCreate",
+        "ConversationTemplateUpdate",
+        "ConversationTemplateResponse",
+        "ChatRequest",
+        "ChatResponse",
+        "ConversationListResponse",
+        "MessageListResponse",
+        "ConversationSearchRequest",
+        "MessageContentSchema",
+        "TextContentSchema",
+        "ImageContentSchema",
+        "FileContentSchema",
+        "ToolCallSchema",
+    ),
+    # Workflow schemas
+    "workflow": (
+        "WorkflowTemplateCreate",
+        "WorkflowTemplateUpdate",
+        "WorkflowTemplateResponse",
+        "WorkflowExecutionCreate",
+        "WorkflowExecutionUpdate",
+        "WorkflowExecutionResponse",
+        "WorkflowStepExecutionResponse",
+        "WorkflowScheduleCreate",
+        "WorkflowScheduleUpdate",
+        "WorkflowScheduleResponse",
+        "WorkflowExecuteRequest",
+        "WorkflowExecuteResponse",
+        "WorkflowListResponse",
+        "WorkflowExecutionListResponse",
+        "WorkflowSearchRequest",
+        "WorkflowStepConfigSchema",
+    ),
+}
 
-# Chat schemas
-from .chat import (
-    ChatConversationCreate,
-    ChatConversationUpdate,
-    ChatConversationResponse,
-    MessageCreate,
-    MessageUpdate,
-    MessageResponse,
-    ConversationFeedbackCreate,
-    ConversationFeedbackResponse,
-    ConversationTemplateCreate,
-    ConversationTemplateUpdate,
-    ConversationTemplateResponse,
-    ChatRequest,
-    ChatResponse,
-    ConversationListResponse,
-    MessageListResponse,
-    ConversationSearchRequest,
-    MessageContentSchema,
-    ToolCallSchema
-)
+_LAZY = {name: module for module, names in _EXPORTS.items() for name in names}
 
-# Workflow schemas
-from .workflow import (
-    WorkflowTemplateCreate,
-    WorkflowTemplateUpdate,
-    WorkflowTemplateResponse,
-    WorkflowExecutionCreate,
-    WorkflowExecutionUpdate,
-    WorkflowExecutionResponse,
-    WorkflowStepExecutionResponse,
-    WorkflowScheduleCreate,
-    WorkflowScheduleUpdate,
-    WorkflowScheduleResponse,
-    WorkflowExecuteRequest,
-    WorkflowExecuteResponse,
-    WorkflowListResponse,
-    WorkflowExecutionListResponse,
-    WorkflowSearchRequest,
-    WorkflowStepConfigSchema
-)
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -8,8 +8,10 @@ from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 from odmantic import ObjectId
 
+from app.models.agent import DEFAULT_INSTRUCTIONS, DEFAULT_MODEL_PARAMETERS
 from app.models.agent_enums import AgentStatus, AgentType
-from app.schemas.base_schema import BaseSchema
+from app.schema_types import TagList
+from app.schemas.base_schema import RESPONSE_CONFIG, BaseSchema
 
 
 # Base schemas
@@ -41,7 +43,7 @@ class AgentConfigurationBase(BaseModel):
     ai_model_provider: str = Field("gemini", description="Model provider: gemini (default)")
     ai_model_id: str = Field("gemini/gemini-2.5-flash-lite", description="Model identifier")
     ai_model_parameters: Dict[str, Any] = Field(
-        default_factory=lambda: {"temperature": 0.7, "max_tokens": 1000},
+        default_factory=lambda: DEFAULT_MODEL_PARAMETERS.copy(),
         description="Model parameters"
     )
 
@@ -49,17 +51,9 @@ class AgentConfigurationBase(BaseModel):
     api_keys: Dict[str, str] = Field(default_factory=dict, description="API keys per provider (encrypted)")
     
     # Agent capabilities
-    capabilities: List[str] = Field(default_factory=list, description="Agent capabilities")
+    capabilities: TagList = Field(default_factory=list, description="Agent capabilities")
     instructions: List[str] = Field(
-        default_factory=lambda: [
-            "You are a helpful AI assistant. Follow these critical guidelines:",
-            "1. NEVER fabricate or invent information about specific systems, architectures, or technical details",
-            "2. If you don't have access to knowledge sources about a topic, clearly state this limitation",
-            "3. Distinguish between general knowledge and specific system knowledge",
-            "4. When asked about specific projects or systems, only provide information if you have verified knowledge sources",
-            "5. If uncertain about any information, express your uncertainty rather than guessing",
-            "6. Always prioritize accuracy over completeness - it's better to say 'I don't know' than to provide incorrect information"
-        ],
+        default_factory=lambda: list(DEFAULT_INSTRUCTIONS),
         description="Agent instructions with anti-hallucination guidelines"
     )
     tools: List[ToolConfigurationSchema] = Field(default_factory=list, description="Available tools")
@@ -85,7 +79,7 @@ class AgentConfigurationBase(BaseModel):
     
     # Metadata
     is_public: bool = Field(False, description="Whether agent is publicly accessible")
-    tags: List[str] = Field(default_factory=list, description="Agent tags")
+    tags: TagList = Field(default_factory=list, description="Agent tags")
 
 
 class AgentConfigurationCreate(AgentConfigurationBase):
@@ -116,7 +110,7 @@ class AgentConfigurationUpdate(BaseModel):
     workflow_steps: Optional[List[Dict[str, Any]]] = None
     status: Optional[AgentStatus] = None
     is_public: Optional[bool] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[TagList] = None
 
 
 class AgentConfigurationResponse(AgentConfigurationBase):
@@ -138,7 +132,7 @@ class AgentConfigurationResponse(AgentConfigurationBase):
     created: datetime = Field(..., description="Creation timestamp")
     updated: datetime = Field(..., description="Last update timestamp")
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = RESPONSE_CONFIG
 
 
 # Agent Session schemas
@@ -184,8 +178,29 @@ class AgentSessionResponse(AgentSessionBase):
     started_at: datetime = Field(..., description="Session start time")
     last_activity: datetime = Field(..., description="Last activity time")
     ended_at: Optional[datetime] = Field(None, description="Session end time")
-    
-    model_config = ConfigDict(from_attributes=True)
+
+    model_config = RESPONSE_CONFIG
+
+    @classmethod
+    def from_model(cls, session: Any) -> AgentSessionResponse:
+        """Build from a stored AgentSession without re-validating its fields"""
+        return cls.model_construct(
+            id=str(session.id),
+            agent_id=str(session.agent_id),
+            user_id=str(session.user_id),
+            session_id=session.session_id,
+            session_name=session.session_name,
+            session_description=session.session_description,
+            is_active=session.is_active,
+            current_context=session.current_context,
+            session_memory=session.session_memory,
+            messages_count=session.messages_count,
+            total_tokens_used=session.total_tokens_used,
+            total_cost=session.total_cost,
+            started_at=session.started_at,
+            last_activity=session.last_activity,
+            ended_at=session.ended_at,
+        )
 
 
 # Agent Metrics schemas
@@ -214,13 +229,38 @@ class AgentMetricsResponse(BaseModel):
     memory_operations: int = Field(0, description="Memory operations count")
     
     created: datetime = Field(..., description="Creation timestamp")
-    
-    model_config = ConfigDict(from_attributes=True)
+
+    model_config = RESPONSE_CONFIG
+
+    @classmethod
+    def from_model(cls, metric: Any) -> AgentMetricsResponse:
+        """Build from a stored AgentMetrics document without re-validating its fields"""
+        return cls.model_construct(
+            id=str(metric.id),
+            agent_id=str(metric.agent_id),
+            user_id=str(metric.user_id),
+            date=metric.date,
+            daily_conversations=metric.daily_conversations,
+            daily_messages=metric.daily_messages,
+            daily_tokens=metric.daily_tokens,
+            daily_cost=metric.daily_cost,
+            average_response_time=metric.average_response_time,
+            success_rate=metric.success_rate,
+            error_rate=metric.error_rate,
+            user_satisfaction=metric.user_satisfaction,
+            tools_used=metric.tools_used,
+            knowledge_searches=metric.knowledge_searches,
+            memory_operations=metric.memory_operations,
+            created=metric.created,
+        )
 
 
 # Request/Response schemas for API endpoints
 class AgentChatRequest(BaseModel):
     """Schema for agent chat request"""
+    # Wire-only schema: build the validator on first use rather than at import
+    model_config = ConfigDict(defer_build=True)
+
     message: str = Field(..., description="User message")
     agent_id: Optional[str] = Field(None, description="Specific agent ID to use")
     session_id: Optional[str] = Field(None, description="Session ID for conversation continuity")
@@ -230,6 +270,8 @@ class AgentChatRequest(BaseModel):
 
 class AgentChatResponse(BaseModel):
     """Schema for agent chat response"""
+    model_config = RESPONSE_CONFIG
+
     message: str = Field(..., description="User message")
     response: str = Field(..., description="Agent response")
     agent_id: str = Field(..., description="Agent configuration ID")
@@ -258,6 +300,8 @@ class AgentListResponse(BaseModel):
     page: int = Field(1, description="Current page")
     page_size: int = Field(20, description="Page size")
 
+    model_config = RESPONSE_CONFIG
+
 
 class AgentSearchRequest(BaseModel):
     """Schema for agent search request"""
@@ -267,3 +311,5 @@ class AgentSearchRequest(BaseModel):
     is_public: Optional[bool] = Field(None, description="Filter by public/private")
     page: int = Field(1, ge=1, description="Page number")
     page_size: int = Field(20, ge=1, le=100, description="Page size")
+
+    model_config = ConfigDict(defer_build=True)
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from pydantic import ConfigDict, BaseModel, Field
+from functools import lru_cache
+from typing import Any, Iterable, List, Sequence
+from pydantic import ConfigDict, BaseModel, Field, TypeAdapter
 from uuid import UUID
 from datetime import date, datetime
 import json
@@ -50,3 +52,36 @@ class MetadataBaseInDBBase(MetadataBaseSchema):
         description="Whether the resource is private to team members with appropriate authorisation.",
     )
     model_config = ConfigDict(from_attributes=True)
+
+
+# Shared by every *Response schema: built from stored documents, and only
+# compiled when first used
+RESPONSE_CONFIG = ConfigDict(from_attributes=True, defer_build=True)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(item_type: type) -> TypeAdapter:
+    return TypeAdapter(List[item_type])
+
+
+def validate_rows(item_type: type, rows: Iterable[Any], *, from_attributes: bool = False) -> List[Any]:
+    """
+    Validate a batch of rows into `item_type` instances in a single pydantic-core call
+
+    Pass `from_attributes=True` to read the rows' attributes, e.g. embedded ODMantic models.
+    """
+    return _list_adapter(item_type).validate_python(list(rows), from_attributes=from_attributes)
+
+
+def dump_page_json(
+    field: str, item_type: type, items: Sequence[Any], *, total: int, page: int, page_size: int
+) -> bytes:
+    """
+    Serialize a paginated list envelope
+
+    The items are dumped once through a TypeAdapter built on first use and spliced
+    next to the pagination keys, so no envelope model is validated per request.
+    """
+    envelope = json.dumps({"total": total, "page": page, "page_size": page_size})
+    return b'{"%s":%s,%s' % (field.encode(), _list_adapter(item_type).dump_json(items), envelope[1:].encode())
+
@@ -2,27 +2,72 @@
 Pydantic schemas for Chat models
 """
 
-from __future__ import annotations
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, FrozenSet, List, Literal, Optional, Sequence, Union
 from datetime import datetime
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Discriminator, Field, Tag
 
+from app.core.time_utils import datetime_now_sec
 from app.models.chat import MessageRole, MessageType, ConversationStatus
-from app.schemas.base_schema import BaseSchema
+from app.schema_types import RawDict
+from app.schemas.base_schema import RESPONSE_CONFIG, BaseSchema, dump_page_json
+
+# Enum fields validate as Literal unions of the enum values: pydantic-core matches
+# them with a set lookup instead of coercing through the enum class
+MessageRoleValue = Literal[tuple(role.value for role in MessageRole)]
+ConversationStatusValue = Literal[tuple(status.value for status in ConversationStatus)]
+
+# Constrained fields shared by the Base/Create/Update/Response variants
+ConversationTitle = Annotated[str, Field(max_length=200)]
+TemplateName = Annotated[str, Field(min_length=1, max_length=100)]
 
 
 # Base schemas
-class MessageContentSchema(BaseModel):
-    """Schema for message content"""
-    type: MessageType = Field(MessageType.TEXT, description="Content type")
+class TextContentSchema(BaseModel):
+    """Schema for text-bearing message content (text, tool calls/results, errors)"""
+    type: Literal["text", "tool_call", "tool_result", "error"] = Field("text", description="Content type")
     text: Optional[str] = Field(None, description="Text content")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
+
+
+class ImageContentSchema(BaseModel):
+    """Schema for image message content"""
+    type: Literal["image"] = Field("image", description="Content type")
     image_url: Optional[str] = Field(None, description="Image URL")
+    text: Optional[str] = Field(None, description="Caption text")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
+
+
+class FileContentSchema(BaseModel):
+    """Schema for file message content"""
+    type: Literal["file"] = Field("file", description="Content type")
     file_url: Optional[str] = Field(None, description="File URL")
     file_name: Optional[str] = Field(None, description="File name")
     file_size: Optional[int] = Field(None, description="File size in bytes")
+    text: Optional[str] = Field(None, description="Caption text")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
 
 
+def _content_branch(value: Any) -> str:
+    """Pick the content schema from `type`; content without a type is text"""
+    content_type = value.get("type") if isinstance(value, dict) else getattr(value, "type", None)
+    if content_type == MessageType.IMAGE:
+        return "image"
+    if content_type == MessageType.FILE:
+        return "file"
+    return "text"
+
+
+# Discriminated on `type` so only the matching branch is validated
+MessageContentSchema = Annotated[
+    Union[
+        Annotated[TextContentSchema, Tag("text")],
+        Annotated[ImageContentSchema, Tag("image")],
+        Annotated[FileContentSchema, Tag("file")],
+    ],
+    Discriminator(_content_branch),
+]
+
+
 class ToolCallSchema(BaseModel):
     """Schema for tool call information"""
     tool_name: str = Field(..., description="Tool name")
@@ -32,30 +77,32 @@ class ToolCallSchema(BaseModel):
     result: Optional[Any] = Field(None, description="Tool execution result")
     error: Optional[str] = Field(None, description="Error message if tool failed")
     execution_time: float = Field(0.0, description="Execution time in seconds")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Execution timestamp")
+    timestamp: Optional[datetime] = Field(None, description="Execution timestamp, stamped by the handler when omitted")
 
 
 # Chat Conversation schemas
 class ChatConversationBase(BaseModel):
     """Base schema for chat conversation"""
-    title: str = Field("New Conversation", max_length=200, description="Conversation title")
+    title: ConversationTitle = Field("New Conversation", description="Conversation title")
     description: str = Field("", description="Conversation description")
+    agent_id: str = Field(..., description="Agent configuration ID")
+    agent_session_id: Optional[str] = Field(None, description="Agent session ID")
+
+    # Configuration
+    agent_config_snapshot: RawDict = Field(default_factory=dict, description="Agent config snapshot")
+    conversation_settings: RawDict = Field(default_factory=dict, description="Conversation settings")
 
 
 class ChatConversationCreate(ChatConversationBase):
     """Schema for creating chat conversation"""
-    agent_id: str = Field(..., description="Agent configuration ID")
     # conversation_id removed - will be generated server-side
-    agent_session_id: Optional[str] = Field(None, description="Agent session ID")
-    agent_config_snapshot: Dict[str, Any] = Field(default_factory=dict, description="Agent config snapshot")
-    conversation_settings: Dict[str, Any] = Field(default_factory=dict, description="Conversation settings")
 
 
 class ChatConversationUpdate(BaseModel):
     """Schema for updating chat conversation"""
-    title: Optional[str] = Field(None, max_length=200)
+    title: Optional[ConversationTitle] = None
     description: Optional[str] = None
-    status: Optional[ConversationStatus] = None
+    status: Optional[ConversationStatusValue] = None
     is_pinned: Optional[bool] = None
     is_shared: Optional[bool] = None
     shared_with: Optional[List[str]] = None
@@ -68,18 +115,12 @@ class ChatConversationResponse(ChatConversationBase):
     id: str = Field(..., description="Conversation ID")
     conversation_id: str = Field(..., description="Unique conversation identifier")
     user_id: str = Field(..., description="User ID")
-    agent_id: str = Field(..., description="Agent configuration ID")
-    agent_session_id: Optional[str] = Field(None, description="Agent session ID")
-    
-    # Configuration
-    agent_config_snapshot: Dict[str, Any] = Field(default_factory=dict, description="Agent config snapshot")
-    conversation_settings: Dict[str, Any] = Field(default_factory=dict, description="Conversation settings")
     
     # State
-    status: ConversationStatus = Field(..., description="Conversation status")
+    status: ConversationStatusValue = Field(..., description="Conversation status")
     is_pinned: bool = Field(False, description="Whether conversation is pinned")
     is_shared: bool = Field(False, description="Whether conversation is shared")
-    shared_with: List[str] = Field(default_factory=list, description="Users with access")
+    shared_with: FrozenSet[str] = Field(default_factory=frozenset, description="Users with access")
     
     # Statistics
     message_count: int = Field(0, description="Number of messages")
@@ -88,7 +129,7 @@ class ChatConversationResponse(ChatConversationBase):
     average_response_time: float = Field(0.0, description="Average response time")
     
     # Context
-    conversation_context: Dict[str, Any] = Field(default_factory=dict, description="Conversation context")
+    conversation_context: RawDict = Field(default_factory=dict, description="Conversation context")
     conversation_summary: str = Field("", description="Conversation summary")
     key_topics: List[str] = Field(default_factory=list, description="Key topics")
     
@@ -98,13 +139,43 @@ class ChatConversationResponse(ChatConversationBase):
     last_message_at: Optional[datetime] = Field(None, description="Last message timestamp")
     archived_at: Optional[datetime] = Field(None, description="Archive timestamp")
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = RESPONSE_CONFIG
+
+    @classmethod
+    def from_model(cls, conversation: Any) -> "ChatConversationResponse":
+        """Build from a stored ChatConversation without re-validating its fields"""
+        return cls.model_construct(
+            id=str(conversation.id),
+            conversation_id=conversation.conversation_id,
+            title=conversation.title,
+            description=conversation.description,
+            user_id=str(conversation.user_id),
+            agent_id=str(conversation.agent_id),
+            agent_session_id=conversation.agent_session_id,
+            agent_config_snapshot=conversation.agent_config_snapshot,
+            conversation_settings=conversation.conversation_settings,
+            status=conversation.status.value,
+            is_pinned=conversation.is_pinned,
+            is_shared=conversation.is_shared,
+            shared_with=frozenset(str(uid) for uid in conversation.shared_with),
+            message_count=conversation.message_count,
+            total_tokens=conversation.total_tokens,
+            total_cost=conversation.total_cost,
+            average_response_time=conversation.average_response_time,
+            conversation_context=conversation.conversation_context,
+            conversation_summary=conversation.conversation_summary,
+            key_topics=conversation.key_topics,
+            created=conversation.created,
+            updated=conversation.updated,
+            last_message_at=conversation.last_message_at,
+            archived_at=conversation.archived_at,
+        )
 
 
 # Message schemas
 class MessageBase(BaseModel):
     """Base schema for message"""
-    role: MessageRole = Field(..., description="Message role")
+    role: MessageRoleValue = Field(..., description="Message role")
     content: List[MessageContentSchema] = Field(default_factory=list, description="Message content")
     raw_content: str = Field("", description="Raw text content")
 
@@ -121,7 +192,7 @@ class MessageUpdate(BaseModel):
     content: Optional[List[MessageContentSchema]] = None
     raw_content: Optional[str] = None
     is_edited: Optional[bool] = None
-    edit_history: Optional[List[Dict[str, Any]]] = None
+    edit_history: Optional[List[RawDict]] = None
     is_deleted: Optional[bool] = None
 
 
@@ -142,20 +213,20 @@ class MessageResponse(MessageBase):
     ai_model_used: Optional[str] = Field(None, description="Model used")
     
     # Context and memory
-    context_used: Dict[str, Any] = Field(default_factory=dict, description="Context used")
-    memory_operations: List[Dict[str, Any]] = Field(default_factory=list, description="Memory operations")
-    knowledge_searches: List[Dict[str, Any]] = Field(default_factory=list, description="Knowledge searches")
+    context_used: RawDict = Field(default_factory=dict, description="Context used")
+    memory_operations: List[RawDict] = Field(default_factory=list, description="Memory operations")
+    knowledge_searches: List[RawDict] = Field(default_factory=list, description="Knowledge searches")
     
     # Status
     is_edited: bool = Field(False, description="Whether message was edited")
-    edit_history: List[Dict[str, Any]] = Field(default_factory=list, description="Edit history")
+    edit_history: List[RawDict] = Field(default_factory=list, description="Edit history")
     is_deleted: bool = Field(False, description="Whether message is deleted")
     
     # Timestamps
     timestamp: datetime = Field(..., description="Message timestamp")
     edited_at: Optional[datetime] = Field(None, description="Edit timestamp")
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = RESPONSE_CONFIG
 
 
 # Conversation Feedback schemas
@@ -182,31 +253,33 @@ class ConversationFeedbackResponse(ConversationFeedbackBase):
     user_id: str = Field(..., description="User ID")
     created: datetime = Field(..., description="Creation timestamp")
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = RESPONSE_CONFIG
 
 
 # Conversation Template schemas
 class ConversationTemplateBase(BaseModel):
     """Base schema for conversation template"""
-    name: str = Field(..., min_length=1, max_length=100, description="Template name")
+    name: TemplateName = Field(..., description="Template name")
     description: str = Field("", description="Template description")
     category: str = Field("general", description="Template category")
     initial_prompt: str = Field(..., description="Initial prompt")
     system_instructions: List[str] = Field(default_factory=list, description="System instructions")
     suggested_questions: List[str] = Field(default_factory=list, description="Suggested questions")
 
-
-class ConversationTemplateCreate(ConversationTemplateBase):
-    """Schema for creating conversation template"""
+    # Configuration
     recommended_agent_level: Optional[str] = Field(None, description="Recommended agent level")
     recommended_tools: List[str] = Field(default_factory=list, description="Recommended tools")
     required_knowledge_sources: List[str] = Field(default_factory=list, description="Required knowledge sources")
     is_public: bool = Field(False, description="Whether template is public")
 
 
+class ConversationTemplateCreate(ConversationTemplateBase):
+    """Schema for creating conversation template"""
+
+
 class ConversationTemplateUpdate(BaseModel):
     """Schema for updating conversation template"""
-    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    name: Optional[TemplateName] = None
     description: Optional[str] = None
     category: Optional[str] = None
     initial_prompt: Optional[str] = None
@@ -223,14 +296,8 @@ class ConversationTemplateResponse(ConversationTemplateBase):
     id: str = Field(..., description="Template ID")
     user_id: str = Field(..., description="Creator user ID")
     
-    # Configuration
-    recommended_agent_level: Optional[str] = Field(None, description="Recommended agent level")
-    recommended_tools: List[str] = Field(default_factory=list, description="Recommended tools")
-    required_knowledge_sources: List[str] = Field(default_factory=list, description="Required knowledge sources")
-    
     # Access control
-    is_public: bool = Field(False, description="Whether template is public")
-    shared_with: List[str] = Field(default_factory=list, description="Users with access")
+    shared_with: FrozenSet[str] = Field(default_factory=frozenset, description="Users with access")
     
     # Usage statistics
     usage_count: int = Field(0, description="Usage count")
@@ -240,7 +307,7 @@ class ConversationTemplateResponse(ConversationTemplateBase):
     created: datetime = Field(..., description="Creation timestamp")
     updated: datetime = Field(..., description="Last update timestamp")
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = RESPONSE_CONFIG
 
 
 # Request/Response schemas for API endpoints
@@ -271,7 +338,9 @@ class ChatResponse(BaseModel):
     memory_accessed: bool = Field(False, description="Whether memory was accessed")
     
     status: str = Field("success", description="Response status")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Response timestamp")
+    timestamp: datetime = Field(default_factory=datetime_now_sec, description="Response timestamp")
+
+    model_config = RESPONSE_CONFIG
 
 
 class ConversationListResponse(BaseModel):
@@ -281,6 +350,17 @@ class ConversationListResponse(BaseModel):
     page: int = Field(1, description="Current page")
     page_size: int = Field(20, description="Page size")
 
+    model_config = RESPONSE_CONFIG
+
+    @classmethod
+    def render_json(
+        cls, conversations: Sequence[ChatConversationResponse], *, total: int, page: int, page_size: int
+    ) -> bytes:
+        """Serialized envelope for a page of already-built responses"""
+        return dump_page_json(
+            "conversations", ChatConversationResponse, conversations, total=total, page=page, page_size=page_size
+        )
+
 
 class MessageListResponse(BaseModel):
     """Schema for message list response"""
@@ -289,11 +369,22 @@ class MessageListResponse(BaseModel):
     page: int = Field(1, description="Current page")
     page_size: int = Field(20, description="Page size")
 
+    model_config = RESPONSE_CONFIG
+
+    @classmethod
+    def render_json(
+        cls, messages: Sequence[MessageResponse], *, total: int, page: int, page_size: int
+    ) -> bytes:
+        """Serialized envelope for a page of already-built responses"""
+        return dump_page_json(
+            "messages", MessageResponse, messages, total=total, page=page, page_size=page_size
+        )
+
 
 class ConversationSearchRequest(BaseModel):
     """Schema for conversation search request"""
     query: Optional[str] = Field(None, description="Search query")
-    status: Optional[ConversationStatus] = Field(None, description="Filter by status")
+    status: Optional[ConversationStatusValue] = Field(None, description="Filter by status")
     agent_id: Optional[str] = Field(None, description="Filter by agent")
     is_pinned: Optional[bool] = Field(None, description="Filter by pinned status")
     date_from: Optional[datetime] = Field(None, description="Filter from date")
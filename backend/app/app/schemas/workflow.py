@@ -2,21 +2,31 @@
 Pydantic schemas for Workflow models
 """
 
-from __future__ import annotations
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, FrozenSet, List, Literal, Optional, Sequence
 from datetime import datetime
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, StringConstraints
 
-from app.models.workflow import WorkflowStatus, StepType
-from app.schemas.base_schema import BaseSchema
+from app.models.workflow import STEP_ID_PATTERN, WorkflowStatus, StepType
+from app.schema_types import RawDict, TagList
+from app.schemas.base_schema import RESPONSE_CONFIG, BaseSchema, dump_page_json, validate_rows
+
+# Enum fields validate as Literal unions of the enum values: pydantic-core matches
+# them with a set lookup instead of coercing through the enum class
+WorkflowStatusValue = Literal[tuple(status.value for status in WorkflowStatus)]
+StepTypeValue = Literal[tuple(step_type.value for step_type in StepType)]
+
+# Constrained fields shared by the Base/Create/Update/Response variants
+TemplateName = Annotated[str, Field(min_length=1, max_length=100)]
+# New step ids must be usable as field names; stored ones are not revalidated
+StepId = Annotated[str, StringConstraints(pattern=STEP_ID_PATTERN.pattern)]
 
 
 # Base schemas
 class WorkflowStepConfigSchema(BaseModel):
     """Schema for workflow step configuration"""
-    step_id: str = Field(..., description="Unique step identifier")
+    step_id: StepId = Field(..., description="Unique step identifier")
     name: str = Field(..., description="Step name")
-    step_type: StepType = Field(..., description="Step type")
+    step_type: StepTypeValue = Field(..., description="Step type")
     config: Dict[str, Any] = Field(default_factory=dict, description="Step configuration")
     conditions: List[Dict[str, Any]] = Field(default_factory=list, description="Step conditions")
     next_steps: List[str] = Field(default_factory=list, description="Next step IDs")
@@ -29,35 +39,37 @@ class WorkflowStepConfigSchema(BaseModel):
 # Workflow Template schemas
 class WorkflowTemplateBase(BaseModel):
     """Base schema for workflow template"""
-    name: str = Field(..., min_length=1, max_length=100, description="Template name")
+    name: TemplateName = Field(..., description="Template name")
     description: str = Field("", description="Template description")
     category: str = Field("general", description="Template category")
     version: str = Field("1.0.0", description="Template version")
-    tags: List[str] = Field(default_factory=list, description="Template tags")
+    tags: TagList = Field(default_factory=list, description="Template tags")
     estimated_duration: int = Field(0, description="Estimated duration in seconds")
     complexity_level: str = Field("medium", description="Complexity level: simple, medium, complex")
 
+    # Configuration
+    steps: List[WorkflowStepConfigSchema] = Field(default_factory=list, description="Workflow steps")
+    global_config: RawDict = Field(default_factory=dict, description="Global configuration")
+    input_schema: RawDict = Field(default_factory=dict, description="Input schema")
+    output_schema: RawDict = Field(default_factory=dict, description="Output schema")
+    is_public: bool = Field(False, description="Whether template is public")
+
 
 class WorkflowTemplateCreate(WorkflowTemplateBase):
     """Schema for creating workflow template"""
-    steps: List[WorkflowStepConfigSchema] = Field(default_factory=list, description="Workflow steps")
-    global_config: Dict[str, Any] = Field(default_factory=dict, description="Global configuration")
-    input_schema: Dict[str, Any] = Field(default_factory=dict, description="Input schema")
-    output_schema: Dict[str, Any] = Field(default_factory=dict, description="Output schema")
-    is_public: bool = Field(False, description="Whether template is public")
 
 
 class WorkflowTemplateUpdate(BaseModel):
     """Schema for updating workflow template"""
-    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    name: Optional[TemplateName] = None
     description: Optional[str] = None
     category: Optional[str] = None
     version: Optional[str] = None
     steps: Optional[List[WorkflowStepConfigSchema]] = None
-    global_config: Optional[Dict[str, Any]] = None
-    input_schema: Optional[Dict[str, Any]] = None
-    output_schema: Optional[Dict[str, Any]] = None
-    tags: Optional[List[str]] = None
+    global_config: Optional[RawDict] = None
+    input_schema: Optional[RawDict] = None
+    output_schema: Optional[RawDict] = None
+    tags: Optional[TagList] = None
     estimated_duration: Optional[int] = None
     complexity_level: Optional[str] = None
     is_public: Optional[bool] = None
@@ -68,15 +80,8 @@ class WorkflowTemplateResponse(WorkflowTemplateBase):
     id: str = Field(..., description="Template ID")
     user_id: str = Field(..., description="Creator user ID")
     
-    # Configuration
-    steps: List[WorkflowStepConfigSchema] = Field(default_factory=list, description="Workflow steps")
-    global_config: Dict[str, Any] = Field(default_factory=dict, description="Global configuration")
-    input_schema: Dict[str, Any] = Field(default_factory=dict, description="Input schema")
-    output_schema: Dict[str, Any] = Field(default_factory=dict, description="Output schema")
-    
     # Access control
-    is_public: bool = Field(False, description="Whether template is public")
-    shared_with: List[str] = Field(default_factory=list, description="Users with access")
+    shared_with: FrozenSet[str] = Field(default_factory=frozenset, description="Users with access")
     
     # Usage statistics
     usage_count: int = Field(0, description="Usage count")
@@ -88,14 +93,14 @@ class WorkflowTemplateResponse(WorkflowTemplateBase):
     created: datetime = Field(..., description="Creation timestamp")
     updated: datetime = Field(..., description="Last update timestamp")
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = RESPONSE_CONFIG
 
 
 # Workflow Execution schemas
 class WorkflowExecutionBase(BaseModel):
     """Base schema for workflow execution"""
     workflow_name: str = Field(..., description="Workflow name")
-    input_parameters: Dict[str, Any] = Field(default_factory=dict, description="Input parameters")
+    input_parameters: RawDict = Field(default_factory=dict, description="Input parameters")
 
 
 class WorkflowExecutionCreate(WorkflowExecutionBase):
@@ -104,17 +109,17 @@ class WorkflowExecutionCreate(WorkflowExecutionBase):
     workflow_template_id: Optional[str] = Field(None, description="Template ID")
     session_id: str = Field(..., description="Session ID")
     steps: List[WorkflowStepConfigSchema] = Field(default_factory=list, description="Execution steps")
-    global_config: Dict[str, Any] = Field(default_factory=dict, description="Global configuration")
+    global_config: RawDict = Field(default_factory=dict, description="Global configuration")
 
 
 class WorkflowExecutionUpdate(BaseModel):
     """Schema for updating workflow execution"""
-    status: Optional[WorkflowStatus] = None
+    status: Optional[WorkflowStatusValue] = None
     current_step_index: Optional[int] = None
     current_step_id: Optional[str] = None
-    step_results: Optional[Dict[str, Any]] = None
+    step_results: Optional[RawDict] = None
     final_result: Optional[Any] = None
-    error_details: Optional[Dict[str, Any]] = None
+    error_details: Optional[RawDict] = None
     steps_completed: Optional[int] = None
     steps_failed: Optional[int] = None
     total_cost: Optional[float] = None
@@ -130,17 +135,17 @@ class WorkflowExecutionResponse(WorkflowExecutionBase):
     
     # Configuration
     steps: List[WorkflowStepConfigSchema] = Field(default_factory=list, description="Execution steps")
-    global_config: Dict[str, Any] = Field(default_factory=dict, description="Global configuration")
+    global_config: RawDict = Field(default_factory=dict, description="Global configuration")
     
     # Execution state
-    status: WorkflowStatus = Field(..., description="Execution status")
+    status: WorkflowStatusValue = Field(..., description="Execution status")
     current_step_index: int = Field(0, description="Current step index")
     current_step_id: Optional[str] = Field(None, description="Current step ID")
     
     # Results
-    step_results: Dict[str, Any] = Field(default_factory=dict, description="Step results")
+    step_results: RawDict = Field(default_factory=dict, description="Step results")
     final_result: Optional[Any] = Field(None, description="Final result")
-    error_details: Optional[Dict[str, Any]] = Field(None, description="Error details")
+    error_details: Optional[RawDict] = Field(None, description="Error details")
     
     # Performance metrics
     total_duration: float = Field(0.0, description="Total duration in seconds")
@@ -154,7 +159,36 @@ class WorkflowExecutionResponse(WorkflowExecutionBase):
     completed_at: Optional[datetime] = Field(None, description="Completion timestamp")
     last_activity: datetime = Field(..., description="Last activity timestamp")
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = RESPONSE_CONFIG
+
+    @classmethod
+    def from_model(cls, execution: Any) -> "WorkflowExecutionResponse":
+        """Build from a stored WorkflowExecution without re-validating its fields"""
+        return cls.model_construct(
+            id=str(execution.id),
+            execution_id=execution.execution_id,
+            workflow_template_id=str(execution.workflow_template_id) if execution.workflow_template_id else None,
+            workflow_name=execution.workflow_name,
+            user_id=str(execution.user_id),
+            session_id=execution.session_id,
+            input_parameters=execution.input_parameters,
+            steps=validate_rows(WorkflowStepConfigSchema, execution.steps, from_attributes=True),
+            global_config=execution.global_config,
+            status=execution.status.value,
+            current_step_index=execution.current_step_index,
+            current_step_id=execution.current_step_id,
+            step_results=execution.step_results,
+            final_result=execution.final_result,
+            error_details=execution.error_details,
+            total_duration=execution.total_duration,
+            steps_completed=execution.steps_completed,
+            steps_failed=execution.steps_failed,
+            total_cost=execution.total_cost,
+            created=execution.created,
+            started_at=execution.started_at,
+            completed_at=execution.completed_at,
+            last_activity=execution.last_activity,
+        )
 
 
 # Workflow Step Execution schemas
@@ -164,20 +198,20 @@ class WorkflowStepExecutionResponse(BaseModel):
     execution_id: str = Field(..., description="Workflow execution ID")
     step_id: str = Field(..., description="Step ID")
     step_name: str = Field(..., description="Step name")
-    step_type: StepType = Field(..., description="Step type")
+    step_type: StepTypeValue = Field(..., description="Step type")
     
     # Configuration
-    step_config: Dict[str, Any] = Field(default_factory=dict, description="Step configuration")
-    input_data: Dict[str, Any] = Field(default_factory=dict, description="Input data")
+    step_config: RawDict = Field(default_factory=dict, description="Step configuration")
+    input_data: RawDict = Field(default_factory=dict, description="Input data")
     
     # Execution state
-    status: WorkflowStatus = Field(..., description="Step status")
+    status: WorkflowStatusValue = Field(..., description="Step status")
     retry_count: int = Field(0, description="Current retry count")
     max_retries: int = Field(3, description="Maximum retries")
     
     # Results
     output_data: Optional[Any] = Field(None, description="Output data")
-    error_details: Optional[Dict[str, Any]] = Field(None, description="Error details")
+    error_details: Optional[RawDict] = Field(None, description="Error details")
     logs: List[str] = Field(default_factory=list, description="Execution logs")
     
     # Performance metrics
@@ -194,7 +228,7 @@ class WorkflowStepExecutionResponse(BaseModel):
     started_at: Optional[datetime] = Field(None, description="Start timestamp")
     completed_at: Optional[datetime] = Field(None, description="Completion timestamp")
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = RESPONSE_CONFIG
 
 
 # Workflow Schedule schemas
@@ -203,7 +237,7 @@ class WorkflowScheduleBase(BaseModel):
     schedule_name: str = Field(..., description="Schedule name")
     cron_expression: str = Field(..., description="Cron expression")
     timezone: str = Field("UTC", description="Timezone")
-    input_parameters: Dict[str, Any] = Field(default_factory=dict, description="Input parameters")
+    input_parameters: RawDict = Field(default_factory=dict, description="Input parameters")
     description: str = Field("", description="Schedule description")
 
 
@@ -218,7 +252,7 @@ class WorkflowScheduleUpdate(BaseModel):
     schedule_name: Optional[str] = None
     cron_expression: Optional[str] = None
     timezone: Optional[str] = None
-    input_parameters: Optional[Dict[str, Any]] = None
+    input_parameters: Optional[RawDict] = None
     description: Optional[str] = None
     is_active: Optional[bool] = None
     max_executions: Optional[int] = None
@@ -241,7 +275,7 @@ class WorkflowScheduleResponse(WorkflowScheduleBase):
     created: datetime = Field(..., description="Creation timestamp")
     updated: datetime = Field(..., description="Last update timestamp")
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = RESPONSE_CONFIG
 
 
 # Request/Response schemas for API endpoints
@@ -249,7 +283,7 @@ class WorkflowExecuteRequest(BaseModel):
     """Schema for workflow execution request"""
     workflow_template_id: Optional[str] = Field(None, description="Template ID to execute")
     workflow_name: str = Field(..., description="Workflow name")
-    input_parameters: Dict[str, Any] = Field(default_factory=dict, description="Input parameters")
+    input_parameters: RawDict = Field(default_factory=dict, description="Input parameters")
     session_id: Optional[str] = Field(None, description="Session ID")
     async_execution: bool = Field(False, description="Whether to execute asynchronously")
 
@@ -258,7 +292,7 @@ class WorkflowExecuteResponse(BaseModel):
     """Schema for workflow execution response"""
     execution_id: str = Field(..., description="Execution ID")
     workflow_name: str = Field(..., description="Workflow name")
-    status: WorkflowStatus = Field(..., description="Execution status")
+    status: WorkflowStatusValue = Field(..., description="Execution status")
     result: Optional[Any] = Field(None, description="Execution result")
     
     # Performance metrics
@@ -272,8 +306,10 @@ class WorkflowExecuteResponse(BaseModel):
     completed_at: Optional[datetime] = Field(None, description="Completion timestamp")
     
     # Additional info
-    step_results: Dict[str, Any] = Field(default_factory=dict, description="Step results")
-    error_details: Optional[Dict[str, Any]] = Field(None, description="Error details if failed")
+    step_results: RawDict = Field(default_factory=dict, description="Step results")
+    error_details: Optional[RawDict] = Field(None, description="Error details if failed")
+
+    model_config = RESPONSE_CONFIG
 
 
 class WorkflowListResponse(BaseModel):
@@ -283,6 +319,17 @@ class WorkflowListResponse(BaseModel):
     page: int = Field(1, description="Current page")
     page_size: int = Field(20, description="Page size")
 
+    model_config = RESPONSE_CONFIG
+
+    @classmethod
+    def render_json(
+        cls, templates: Sequence[WorkflowTemplateResponse], *, total: int, page: int, page_size: int
+    ) -> bytes:
+        """Serialized envelope for a page of already-built responses"""
+        return dump_page_json(
+            "templates", WorkflowTemplateResponse, templates, total=total, page=page, page_size=page_size
+        )
+
 
 class WorkflowExecutionListResponse(BaseModel):
     """Schema for workflow execution list response"""
@@ -291,6 +338,17 @@ class WorkflowExecutionListResponse(BaseModel):
     page: int = Field(1, description="Current page")
     page_size: int = Field(20, description="Page size")
 
+    model_config = RESPONSE_CONFIG
+
+    @classmethod
+    def render_json(
+        cls, executions: Sequence[WorkflowExecutionResponse], *, total: int, page: int, page_size: int
+    ) -> bytes:
+        """Serialized envelope for a page of already-built responses"""
+        return dump_page_json(
+            "executions", WorkflowExecutionResponse, executions, total=total, page=page, page_size=page_size
+        )
+
 
 class WorkflowSearchRequest(BaseModel):
     """Schema for workflow search request"""
@@ -3,8 +3,15 @@ Vexel Admin Service
 Provides administrative functions for user tier management, usage monitoring, and system administration
 """
 
+import bisect
 import logging
-from typing import Dict, Any, List, Optional
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from itertools import islice
+from operator import itemgetter
+from functools import lru_cache, wraps
+from typing import Callable, Deque, Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 
@@ -24,15 +31,102 @@ class AdminAction(str, Enum):
     SYSTEM_MAINTENANCE = "system_maintenance"
 
 
+@dataclass(slots=True)
+class AuditEntry:
+    """Admin action recorded in the audit log"""
+    action: AdminAction
+    user_id: str
+    admin_id: str
+    timestamp: str
+    # Action-specific details; None when the field does not apply to the action
+    old_tier: Optional[str] = None
+    new_tier: Optional[str] = None
+    reason: Optional[str] = None
+    reset_type: Optional[str] = None
+    feature: Optional[str] = None
+    enabled: Optional[bool] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Entry as a dict, omitting fields that do not apply to its action"""
+        return {
+            name: value
+            for name in self.__slots__
+            if (value := getattr(self, name)) is not None
+        }
+
+
+# Per-user feature flags that admins may toggle
+_TOGGLEABLE_FEATURES = (
+    "advanced_chunking_enabled",
+    "parallel_processing_enabled",
+    "analytics_enabled",
+)
+_VALID_FEATURES = frozenset(_TOGGLEABLE_FEATURES)
+_INVALID_FEATURE_ERROR = f"Invalid feature. Valid features: {list(_TOGGLEABLE_FEATURES)}"
+
+
+# Lower bounds of each health status band, ascending; scores below the first are critical
+_HEALTH_CUTS = (25, 50, 75, 90)
+_HEALTH_LABELS = ("critical", "poor", "fair", "good", "excellent")
+
+
+# Second-resolution prefix of the last formatted timestamp, reused until the second changes
+_last_timestamp_prefix: Tuple[int, str] = (0, "")
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time in ISO 8601 with microseconds, formatting the date part at most once per second"""
+    global _last_timestamp_prefix
+    now = time.time()
+    second = int(now)
+    if second != _last_timestamp_prefix[0]:
+        _last_timestamp_prefix = (second, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second)))
+    return f"{_last_timestamp_prefix[1]}.{int((now - second) * 1_000_000):06d}"
+
+
+def _ttl_cached(method: Callable) -> Callable:
+    """Serve repeated calls with the same arguments from the service cache for `cache_ttl` seconds"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        cached = self._response_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < self.cache_ttl:
+            return cached[0]
+        result = method(self, *args, **kwargs)
+        self._response_cache[key] = (result, now)
+        return result
+    return wrapper
+
+
 class VexelAdminService:
     """
     Service for administrative functions and user management
     """
     
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 30.0):
         """Initialize the admin service"""
-        self.audit_log: List[Dict[str, Any]] = []
+        # Dashboard reads are cached briefly; admin actions clear the cache
+        self.cache_ttl = cache_ttl
+        self._response_cache: Dict[Tuple, Tuple[Any, float]] = {}
+        # Entries are appended in chronological order, so the newest are at the right end
+        self.audit_log: Deque[AuditEntry] = deque(maxlen=settings.MAX_AUDIT_LOG_ENTRIES)
+        # Per-action view of the same entries so filtered reads skip unrelated actions
+        self._audit_log_by_action: Dict[AdminAction, Deque[AuditEntry]] = defaultdict(
+            lambda: deque(maxlen=settings.MAX_AUDIT_LOG_ENTRIES)
+        )
+    
+    def _record_action(self, entry: AuditEntry) -> None:
+        """Append an entry to the audit log and its per-action index"""
+        self.audit_log.append(entry)
+        self._audit_log_by_action[entry.action].append(entry)
+        self.clear_cache()
     
+    def clear_cache(self) -> None:
+        """Drop cached summary, analytics and health results"""
+        self._response_cache.clear()
+    
+    @_ttl_cached
     def get_user_tier_summary(self) -> Dict[str, Any]:
         """Get summary of users by tier"""
         # In a real implementation, this would query the database
@@ -48,6 +142,7 @@ class VexelAdminService:
             "new_users_7d": 0
         }
     
+    @_ttl_cached
     def get_usage_analytics(self, days: int = 30) -> Dict[str, Any]:
         """Get usage analytics for the specified period"""
         end_date = datetime.utcnow()
@@ -55,6 +150,8 @@ class VexelAdminService:
         
         # Get performance data
         performance_data = performance_monitor.get_performance_summary(time_window_hours=days * 24)
+        total_uploads = performance_data.get("total_operations", 0)
+        failed_uploads = int(performance_data.get("error_rate", 0) * total_uploads)
         
         return {
             "period": {
@@ -63,10 +160,9 @@ class VexelAdminService:
                 "days": days
             },
             "upload_statistics": {
-                "total_uploads": performance_data.get("total_operations", 0),
-                "successful_uploads": performance_data.get("total_operations", 0) - 
-                                    int(performance_data.get("error_rate", 0) * performance_data.get("total_operations", 0)),
-                "failed_uploads": int(performance_data.get("error_rate", 0) * performance_data.get("total_operations", 0)),
+                "total_uploads": total_uploads,
+                "successful_uploads": total_uploads - failed_uploads,
+                "failed_uploads": failed_uploads,
                 "average_file_size_mb": 2.5,  # Mock data
                 "total_storage_gb": 150.0  # Mock data
             },
@@ -93,24 +189,24 @@ class VexelAdminService:
             # 3. Update user tier and related fields
             # 4. Log the action
             
-            action_log = {
-                "action": AdminAction.TIER_UPGRADE,
-                "user_id": user_id,
-                "admin_id": admin_id,
-                "old_tier": "free",  # Would fetch from database
-                "new_tier": new_tier,
-                "reason": reason,
-                "timestamp": datetime.utcnow().isoformat()
-            }
+            entry = AuditEntry(
+                action=AdminAction.TIER_UPGRADE,
+                user_id=user_id,
+                admin_id=admin_id,
+                old_tier="free",  # Would fetch from database
+                new_tier=new_tier,
+                reason=reason,
+                timestamp=_utc_timestamp()
+            )
             
-            self.audit_log.append(action_log)
+            self._record_action(entry)
             
-            logger.info(f"User {user_id} upgraded to {new_tier} by admin {admin_id}")
+            logger.info("User %s upgraded to %s by admin %s", user_id, new_tier, admin_id)
             
             return {
                 "success": True,
                 "message": f"User upgraded to {new_tier} successfully",
-                "action_log": action_log
+                "action_log": entry.to_dict()
             }
             
         except Exception as e:
@@ -124,24 +220,24 @@ class VexelAdminService:
         """Downgrade user to a lower tier"""
         try:
             # Similar to upgrade but with validation for downgrade
-            action_log = {
-                "action": AdminAction.TIER_DOWNGRADE,
-                "user_id": user_id,
-                "admin_id": admin_id,
-                "old_tier": "premium",  # Would fetch from database
-                "new_tier": new_tier,
-                "reason": reason,
-                "timestamp": datetime.utcnow().isoformat()
-            }
+            entry = AuditEntry(
+                action=AdminAction.TIER_DOWNGRADE,
+                user_id=user_id,
+                admin_id=admin_id,
+                old_tier="premium",  # Would fetch from database
+                new_tier=new_tier,
+                reason=reason,
+                timestamp=_utc_timestamp()
+            )
             
-            self.audit_log.append(action_log)
+            self._record_action(entry)
             
-            logger.info(f"User {user_id} downgraded to {new_tier} by admin {admin_id}")
+            logger.info("User %s downgraded to %s by admin %s", user_id, new_tier, admin_id)
             
             return {
                 "success": True,
                 "message": f"User downgraded to {new_tier} successfully",
-                "action_log": action_log,
+                "action_log": entry.to_dict(),
                 "warnings": [
                     "User may lose access to premium features",
                     "Existing documents will retain their chunking strategy"
@@ -159,22 +255,22 @@ class VexelAdminService:
         """Reset user usage counters"""
         try:
             # In a real implementation, this would update the database
-            action_log = {
-                "action": AdminAction.USAGE_RESET,
-                "user_id": user_id,
-                "admin_id": admin_id,
-                "reset_type": reset_type,
-                "timestamp": datetime.utcnow().isoformat()
-            }
+            entry = AuditEntry(
+                action=AdminAction.USAGE_RESET,
+                user_id=user_id,
+                admin_id=admin_id,
+                reset_type=reset_type,
+                timestamp=_utc_timestamp()
+            )
             
-            self.audit_log.append(action_log)
+            self._record_action(entry)
             
-            logger.info(f"User {user_id} usage reset ({reset_type}) by admin {admin_id}")
+            logger.info("User %s usage reset (%s) by admin %s", user_id, reset_type, admin_id)
             
             return {
                 "success": True,
                 "message": f"User {reset_type} usage reset successfully",
-                "action_log": action_log
+                "action_log": entry.to_dict()
             }
             
         except Exception as e:
@@ -187,35 +283,32 @@ class VexelAdminService:
     def toggle_feature_access(self, user_id: str, feature: str, enabled: bool, admin_id: str) -> Dict[str, Any]:
         """Toggle specific feature access for a user"""
         try:
-            valid_features = [
-                "advanced_chunking_enabled",
-                "parallel_processing_enabled", 
-                "analytics_enabled"
-            ]
-            
-            if feature not in valid_features:
+            if feature not in _VALID_FEATURES:
                 return {
                     "success": False,
-                    "error": f"Invalid feature. Valid features: {valid_features}"
+                    "error": _INVALID_FEATURE_ERROR
                 }
             
-            action_log = {
-                "action": AdminAction.FEATURE_TOGGLE,
-                "user_id": user_id,
-                "admin_id": admin_id,
-                "feature": feature,
-                "enabled": enabled,
-                "timestamp": datetime.utcnow().isoformat()
-            }
+            entry = AuditEntry(
+                action=AdminAction.FEATURE_TOGGLE,
+                user_id=user_id,
+                admin_id=admin_id,
+                feature=feature,
+                enabled=enabled,
+                timestamp=_utc_timestamp()
+            )
             
-            self.audit_log.append(action_log)
+            self._record_action(entry)
             
-            logger.info(f"Feature {feature} {'enabled' if enabled else 'disabled'} for user {user_id} by admin {admin_id}")
+            logger.info(
+                "Feature %s %s for user %s by admin %s",
+                feature, "enabled" if enabled else "disabled", user_id, admin_id
+            )
             
             return {
                 "success": True,
                 "message": f"Feature {feature} {'enabled' if enabled else 'disabled'} successfully",
-                "action_log": action_log
+                "action_log": entry.to_dict()
             }
             
         except Exception as e:
@@ -225,6 +318,7 @@ class VexelAdminService:
                 "error": str(e)
             }
     
+    @_ttl_cached
     def get_system_health(self) -> Dict[str, Any]:
         """Get system health and performance metrics"""
         try:
@@ -252,7 +346,7 @@ class VexelAdminService:
                     for insight in insights[-5:]  # Last 5 insights
                 ],
                 "system_metrics": {
-                    "total_metrics_collected": len(performance_monitor.metrics),
+                    "total_metrics_collected": performance_monitor.metric_count,
                     "error_rate_24h": recent_performance.get("error_rate", 0),
                     "average_processing_time": recent_performance.get("processing_time", {}).get("mean", 0),
                     "throughput_ops_per_hour": recent_performance.get("throughput", {}).get("operations_per_hour", 0)
@@ -301,34 +395,24 @@ class VexelAdminService:
     
     def _get_health_status(self, health_score: float) -> str:
         """Get health status based on score"""
-        if health_score >= 90:
-            return "excellent"
-        elif health_score >= 75:
-            return "good"
-        elif health_score >= 50:
-            return "fair"
-        elif health_score >= 25:
-            return "poor"
-        else:
-            return "critical"
+        return _HEALTH_LABELS[bisect.bisect_right(_HEALTH_CUTS, health_score)]
     
     def get_audit_log(self, limit: int = 100, action_type: Optional[AdminAction] = None) -> List[Dict[str, Any]]:
         """Get audit log of admin actions"""
-        logs = self.audit_log
-        
+        # Most recent first: walk from the newest entry and stop after `limit` entries
         if action_type:
-            logs = [log for log in logs if log.get("action") == action_type]
-        
-        # Sort by timestamp (most recent first)
-        logs = sorted(logs, key=lambda x: x.get("timestamp", ""), reverse=True)
+            logs = self._audit_log_by_action.get(action_type, ())
+        else:
+            logs = self.audit_log
         
-        return logs[:limit]
+        return [entry.to_dict() for entry in islice(reversed(logs), limit)]
     
     def generate_usage_report(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """Generate comprehensive usage report for a date range"""
         try:
             days = (end_date - start_date).days
             usage_data = self.get_usage_analytics(days)
+            strategy_usage = usage_data["chunking_analytics"]["strategy_usage"]
             
             report = {
                 "report_period": {
@@ -342,13 +426,12 @@ class VexelAdminService:
                                    max(usage_data["upload_statistics"]["total_uploads"], 1)) * 100,
                     "average_processing_time": usage_data["chunking_analytics"]["average_processing_time"],
                     "most_popular_strategy": max(
-                        usage_data["chunking_analytics"]["strategy_usage"].items(),
-                        key=lambda x: x[1]
-                    )[0] if usage_data["chunking_analytics"]["strategy_usage"] else "N/A"
+                        strategy_usage.items(), key=itemgetter(1)
+                    )[0] if strategy_usage else "N/A"
                 },
                 "detailed_analytics": usage_data,
                 "recommendations": self._generate_recommendations(usage_data),
-                "generated_at": datetime.utcnow().isoformat()
+                "generated_at": _utc_timestamp()
             }
             
             return report
@@ -357,15 +440,16 @@ class VexelAdminService:
             logger.error(f"Failed to generate usage report: {str(e)}")
             return {
                 "error": str(e),
-                "generated_at": datetime.utcnow().isoformat()
+                "generated_at": _utc_timestamp()
             }
     
     def _generate_recommendations(self, usage_data: Dict[str, Any]) -> List[str]:
         """Generate recommendations based on usage data"""
         recommendations = []
+        upload_stats = usage_data.get("upload_statistics", {})
+        chunking_analytics = usage_data.get("chunking_analytics", {})
         
         # Check error rate
-        upload_stats = usage_data.get("upload_statistics", {})
         total_uploads = upload_stats.get("total_uploads", 0)
         failed_uploads = upload_stats.get("failed_uploads", 0)
         
@@ -377,16 +461,16 @@ class VexelAdminService:
                 )
         
         # Check processing time
-        avg_processing_time = usage_data.get("chunking_analytics", {}).get("average_processing_time", 0)
+        avg_processing_time = chunking_analytics.get("average_processing_time", 0)
         if avg_processing_time > 10:
             recommendations.append(
                 f"Average processing time is high ({avg_processing_time:.1f}s). Consider optimizing chunking strategies."
             )
         
         # Check strategy distribution
-        strategy_usage = usage_data.get("chunking_analytics", {}).get("strategy_usage", {})
-        if strategy_usage:
-            total_strategy_usage = sum(strategy_usage.values())
+        strategy_usage = chunking_analytics.get("strategy_usage", {})
+        total_strategy_usage = sum(strategy_usage.values())
+        if total_strategy_usage:
             fixed_percentage = (strategy_usage.get("fixed", 0) / total_strategy_usage) * 100
             
             if fixed_percentage > 70:
@@ -398,18 +482,26 @@ class VexelAdminService:
             recommendations.append("System performance is within normal parameters.")
         
         return recommendations
+    
+    @_ttl_cached
+    def get_dashboard(self) -> Dict[str, Any]:
+        """Assemble the admin dashboard; served from the cache until it expires or an action is recorded"""
+        return {
+            "user_summary": self.get_user_tier_summary(),
+            "usage_analytics": self.get_usage_analytics(30),
+            "system_health": self.get_system_health(),
+            "recent_actions": self.get_audit_log(20),
+            "generated_at": _utc_timestamp()
+        }
 
 
-# Global instance
-admin_service = VexelAdminService()
+@lru_cache(maxsize=1)
+def get_admin_service() -> VexelAdminService:
+    """Shared admin service, created on first use rather than at import"""
+    return VexelAdminService()
 
 
 def get_admin_dashboard() -> Dict[str, Any]:
     """Get comprehensive admin dashboard data"""
-    return {
-        "user_summary": admin_service.get_user_tier_summary(),
-        "usage_analytics": admin_service.get_usage_analytics(30),
-        "system_health": admin_service.get_system_health(),
-        "recent_actions": admin_service.get_audit_log(20),
-        "generated_at": datetime.utcnow().isoformat()
-    }
+    # Shallow copy so callers can add keys without touching the cached dashboard
+    return dict(get_admin_service().get_dashboard())
@@ -3,14 +3,55 @@ Vexel Content Analysis Service
 Analyzes document content to recommend optimal chunking strategies and configurations
 """
 
+import bisect
+import hashlib
 import re
 import logging
-from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Pattern, Tuple
+from dataclasses import dataclass, replace
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Number of distinct (content, file type) analyses kept for repeat requests
+ANALYSIS_CACHE_SIZE = 256
+
+# Documents longer than this are analyzed on their head, middle and tail only;
+# the structure and complexity metrics are ratios, so a sample estimates them
+SAMPLE_THRESHOLD = 2_000_000
+SAMPLE_SEGMENT_LENGTH = 512_000
+
+# Upper bounds (exclusive) of each speed rating in seconds, and of each memory band in MB
+_SPEED_THRESHOLDS = (1, 5, 15, 30)
+_SPEED_RATINGS = ("Very Fast", "Fast", "Moderate", "Slow", "Very Slow")
+_MEMORY_THRESHOLDS_MB = (10, 50, 200)
+_MEMORY_RATINGS = ("Low (< 10MB)", "Moderate (10-50MB)", "High (50-200MB)", "Very High (> 200MB)")
+
+# Base recommendations by file type
+_BASE_RECOMMENDATIONS = {
+    'pdf': {'strategy': 'recursive', 'chunk_size': 3000, 'overlap': 200},
+    'txt': {'strategy': 'fixed', 'chunk_size': 5000, 'overlap': 100},
+    'markdown': {'strategy': 'markdown', 'chunk_size': 4000, 'overlap': 150},
+    'csv': {'strategy': 'document', 'chunk_size': 2000, 'overlap': 0},
+    'json': {'strategy': 'document', 'chunk_size': 2500, 'overlap': 0},
+    'docx': {'strategy': 'recursive', 'chunk_size': 3500, 'overlap': 175}
+}
+
+# Sentence terminators; a document has one more sentence than terminator runs
+_SENTENCE_BREAK = re.compile(r'[.!?]+')
+
+# Whitespace as str.split() sees it; words lie between these runs
+_WHITESPACE_RUN = re.compile(r'\s+')
+
+# Characters at least one of which every pattern of a structure category requires;
+# when none occur in the document the category's regex pass is skipped
+_STRUCTURE_TRIGGERS = {
+    'lists': ('-', '*', '+', '.', ')'),
+    'tables': ('|', '+'),
+    'citations': ('[', '('),
+}
+
 
 class ContentComplexity(str, Enum):
     """Content complexity levels"""
@@ -28,7 +69,7 @@ class DocumentStructure(str, Enum):
     HIGHLY_STRUCTURED = "highly_structured"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ContentAnalysisResult:
     """Result of content analysis"""
     file_type: str
@@ -50,32 +91,70 @@ class VexelContentAnalyzer:
     
     def __init__(self):
         """Initialize the content analyzer"""
+        # Structure is scored per line, so no pattern may match across a newline
+        # ([^\S\n] is whitespace other than a newline)
         self.structure_patterns = {
             'headers': [
-                r'^#{1,6}\s+.+$',  # Markdown headers
-                r'^[A-Z][A-Z\s]+$',  # ALL CAPS headers
-                r'^\d+\.\s+.+$',  # Numbered sections
-                r'^[IVX]+\.\s+.+$',  # Roman numeral sections
+                r'^#{1,6}[^\S\n]+.+$',  # Markdown headers
+                r'^[A-Z](?:[A-Z]|[^\S\n])+$',  # ALL CAPS headers
+                r'^\d+\.[^\S\n]+.+$',  # Numbered sections
+                r'^[IVX]+\.[^\S\n]+.+$',  # Roman numeral sections
             ],
             'lists': [
-                r'^\s*[-*+]\s+.+$',  # Bullet lists
-                r'^\s*\d+\.\s+.+$',  # Numbered lists
-                r'^\s*[a-z]\)\s+.+$',  # Lettered lists
+                r'^[^\S\n]*[-*+][^\S\n]+.+$',  # Bullet lists
+                r'^[^\S\n]*\d+\.[^\S\n]+.+$',  # Numbered lists
+                r'^[^\S\n]*[a-z]\)[^\S\n]+.+$',  # Lettered lists
             ],
             'code_blocks': [
-                r'```[\s\S]*?```',  # Markdown code blocks
-                r'`[^`]+`',  # Inline code
-                r'^\s{4,}.+$',  # Indented code
+                r'```.*?```',  # Markdown code blocks
+                r'`[^`\n]+`',  # Inline code
+                r'^[^\S\n]{4,}.+$',  # Indented code
             ],
             'tables': [
                 r'\|.*\|',  # Markdown tables
-                r'^\s*\+[-+]+\+\s*$',  # ASCII tables
+                r'^[^\S\n]*\+[-+]+\+[^\S\n]*$',  # ASCII tables
             ],
             'citations': [
                 r'\[\d+\]',  # Numbered citations
-                r'\([A-Za-z]+\s+\d{4}\)',  # Author year citations
+                r'\([A-Za-z]+[^\S\n]+\d{4}\)',  # Author year citations
             ]
         }
+        
+        # Technical content indicators
+        self.technical_patterns = [
+            r'\b[A-Z]{2,}\b',  # Acronyms
+            r'\b\d+\.\d+\b',  # Numbers with decimals
+        ]
+        # Function calls; only tried where a run of letters starts, since a failed
+        # attempt would fail again from every later letter of the same run
+        self.function_call_pattern = r'(?<![a-zA-Z])[a-zA-Z]+\([^)]*\)'
+        # Single characters are counted with str.count rather than a regex pass
+        self.technical_chars = '{}[]()<>'  # Brackets, braces and angle brackets
+        
+        # Compiled once here rather than looked up in the re cache for every line.
+        # Any pattern of a category scores the line, so each category is one alternation.
+        self._compiled_structure_patterns: Dict[str, Pattern] = {
+            element_type: re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.MULTILINE)
+            for element_type, patterns in self.structure_patterns.items()
+        }
+        self._compiled_technical_patterns: List[Pattern] = [
+            re.compile(pattern) for pattern in self.technical_patterns
+        ]
+        self._compiled_function_call_pattern: Pattern = re.compile(self.function_call_pattern)
+        
+        # Everything but the content-length scaling depends only on these three
+        # inputs, so every combination is worked out once here
+        self._strategy_table: Dict[
+            Tuple[str, DocumentStructure, ContentComplexity], Tuple[str, int, int, float, str]
+        ] = {
+            (file_type, structure, complexity): self._build_strategy_entry(file_type, structure, complexity)
+            for file_type in _BASE_RECOMMENDATIONS
+            for structure in DocumentStructure
+            for complexity in ContentComplexity
+        }
+        
+        # Results keyed by content digest and file type, least recently used first
+        self._analysis_cache: "OrderedDict[Tuple[bytes, str], ContentAnalysisResult]" = OrderedDict()
     
     def analyze_content(
         self, 
@@ -94,15 +173,26 @@ class VexelContentAnalyzer:
         Returns:
             ContentAnalysisResult with recommendations
         """
+        # The same document is often analyzed again (preview, then processing)
+        cache_key = (
+            hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest(),
+            file_type
+        )
+        cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            self._analysis_cache.move_to_end(cache_key)
+            return replace(cached, analysis_details={**cached.analysis_details, 'filename': filename})
+        
         try:
             # Basic metrics
             content_length = len(content)
+            sample = self._sample_content(content)
             
             # Analyze structure
-            structure_analysis = self._analyze_structure(content, file_type)
+            structure_analysis = self._analyze_structure(sample, file_type)
             
             # Analyze complexity
-            complexity_analysis = self._analyze_complexity(content, file_type)
+            complexity_analysis = self._analyze_complexity(sample, file_type)
             
             # Determine optimal strategy
             strategy_recommendation = self._recommend_strategy(
@@ -114,7 +204,7 @@ class VexelContentAnalyzer:
                 content_length, strategy_recommendation['strategy']
             )
             
-            return ContentAnalysisResult(
+            result = ContentAnalysisResult(
                 file_type=file_type,
                 content_length=content_length,
                 complexity=complexity_analysis['complexity'],
@@ -126,45 +216,59 @@ class VexelContentAnalyzer:
                 analysis_details={
                     'structure_analysis': structure_analysis,
                     'complexity_analysis': complexity_analysis,
-                    'filename': filename
+                    'sampled_length': len(sample)
                 },
                 performance_estimate=performance_estimate
             )
             
+            self._analysis_cache[cache_key] = result
+            if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+            
+            return replace(result, analysis_details={**result.analysis_details, 'filename': filename})
+            
         except Exception as e:
-            logger.error(f"Content analysis failed: {str(e)}")
+            logger.error("Content analysis failed: %s", e)
             # Return safe defaults
             return self._get_default_analysis(content, file_type)
     
+    @staticmethod
+    def _sample_content(content: str) -> str:
+        """Return the document, or its head, middle and tail when it is very large"""
+        content_length = len(content)
+        if content_length <= SAMPLE_THRESHOLD:
+            return content
+        
+        half_segment = SAMPLE_SEGMENT_LENGTH // 2
+        middle = content_length // 2
+        return "\n\n".join((
+            content[:SAMPLE_SEGMENT_LENGTH],
+            content[middle - half_segment:middle + half_segment],
+            content[-SAMPLE_SEGMENT_LENGTH:],
+        ))
+    
     def _analyze_structure(self, content: str, file_type: str) -> Dict[str, Any]:
         """Analyze document structure"""
-        lines = content.split('\n')
-        total_lines = len(lines)
-        
-        structure_scores = {
-            'headers': 0,
-            'lists': 0,
-            'code_blocks': 0,
-            'tables': 0,
-            'citations': 0
-        }
-        
-        # Count structural elements
-        for line in lines:
-            for element_type, patterns in self.structure_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, line, re.MULTILINE):
-                        structure_scores[element_type] += 1
-                        break
+        total_lines = content.count('\n') + 1
+        
+        # Count lines containing each structural element, scanning the whole document once per element
+        structure_scores = {}
+        for element_type, pattern in self._compiled_structure_patterns.items():
+            triggers = _STRUCTURE_TRIGGERS.get(element_type)
+            if triggers and not any(char in content for char in triggers):
+                structure_scores[element_type] = 0
+            else:
+                structure_scores[element_type] = self._count_matching_lines(pattern, content)
         
         # Calculate structure ratios
+        line_count = max(total_lines, 1)
         structure_ratios = {
-            key: score / max(total_lines, 1) 
+            key: score / line_count
             for key, score in structure_scores.items()
         }
         
-        # Determine overall structure level
-        total_structure_score = sum(structure_ratios.values())
+        # Determine overall structure level from the summed counts rather than the summed ratios
+        total_structure_score = sum(structure_scores.values()) / line_count
         
         if total_structure_score > 0.3:
             structure_level = DocumentStructure.HIGHLY_STRUCTURED
@@ -183,30 +287,48 @@ class VexelContentAnalyzer:
             'total_lines': total_lines
         }
     
+    @staticmethod
+    def _count_matching_lines(pattern: Pattern, content: str) -> int:
+        """Count the lines of `content` holding at least one match of a line-bound pattern"""
+        count = 0
+        last_line_start = -1
+        for match in pattern.finditer(content):
+            line_start = content.rfind('\n', 0, match.start()) + 1
+            if line_start != last_line_start:
+                count += 1
+                last_line_start = line_start
+        return count
+    
     def _analyze_complexity(self, content: str, file_type: str) -> Dict[str, Any]:
         """Analyze content complexity"""
-        # Basic text metrics
-        words = content.split()
-        sentences = re.split(r'[.!?]+', content)
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+        # Basic text metrics, taken from the whitespace runs rather than a list of every word.
+        # Runs are mostly single spaces and newlines, which CPython does not allocate anew.
+        whitespace_runs = _WHITESPACE_RUN.findall(content)
+        word_chars = len(content) - sum(map(len, whitespace_runs))
+        if word_chars:
+            # One word per gap between runs, less a leading or trailing run with no word beyond it
+            word_count = len(whitespace_runs) + 1 - content[0].isspace() - content[-1].isspace()
+        else:
+            word_count = 0
+        # Counted from the terminator runs instead of splitting out every sentence
+        sentence_count = len(_SENTENCE_BREAK.findall(content)) + 1
+        # Non-blank blocks between blank lines; isspace avoids stripping a copy of each block
+        paragraph_count = sum(1 for p in content.split('\n\n') if p and not p.isspace())
         
         # Calculate complexity metrics
-        avg_words_per_sentence = len(words) / max(len(sentences), 1)
-        avg_sentences_per_paragraph = len(sentences) / max(len(paragraphs), 1)
-        avg_word_length = sum(len(word) for word in words) / max(len(words), 1)
-        
-        # Technical content indicators
-        technical_patterns = [
-            r'\b[A-Z]{2,}\b',  # Acronyms
-            r'\b\d+\.\d+\b',  # Numbers with decimals
-            r'[a-zA-Z]+\([^)]*\)',  # Function calls
-            r'[{}[\]()]',  # Brackets and braces
-            r'[<>]',  # Angle brackets
-        ]
+        avg_words_per_sentence = word_count / max(sentence_count, 1)
+        avg_sentences_per_paragraph = sentence_count / max(paragraph_count, 1)
+        avg_word_length = word_chars / max(word_count, 1)
         
         technical_score = 0
-        for pattern in technical_patterns:
-            technical_score += len(re.findall(pattern, content))
+        for pattern in self._compiled_technical_patterns:
+            technical_score += len(pattern.findall(content))
+        # A call must end with ')', so nothing after the last one can match; stopping
+        # there keeps an unclosed '(' from rescanning the rest of the document
+        last_close = content.rfind(')')
+        if last_close != -1:
+            technical_score += len(self._compiled_function_call_pattern.findall(content, 0, last_close + 1))
+        technical_score += sum(map(content.count, self.technical_chars))
         
         technical_ratio = technical_score / max(len(content), 1)
         
@@ -234,9 +356,9 @@ class VexelContentAnalyzer:
             'avg_sentences_per_paragraph': avg_sentences_per_paragraph,
             'avg_word_length': avg_word_length,
             'technical_ratio': technical_ratio,
-            'word_count': len(words),
-            'sentence_count': len(sentences),
-            'paragraph_count': len(paragraphs)
+            'word_count': word_count,
+            'sentence_count': sentence_count,
+            'paragraph_count': paragraph_count
         }
     
     def _recommend_strategy(
@@ -248,20 +370,34 @@ class VexelContentAnalyzer:
     ) -> Dict[str, Any]:
         """Recommend optimal chunking strategy based on analysis"""
         
-        structure = structure_analysis['structure']
-        complexity = complexity_analysis['complexity']
-        
-        # Base recommendations by file type
-        base_recommendations = {
-            'pdf': {'strategy': 'recursive', 'chunk_size': 3000, 'overlap': 200},
-            'txt': {'strategy': 'fixed', 'chunk_size': 5000, 'overlap': 100},
-            'markdown': {'strategy': 'markdown', 'chunk_size': 4000, 'overlap': 150},
-            'csv': {'strategy': 'document', 'chunk_size': 2000, 'overlap': 0},
-            'json': {'strategy': 'document', 'chunk_size': 2500, 'overlap': 0},
-            'docx': {'strategy': 'recursive', 'chunk_size': 3500, 'overlap': 175}
-        }
+        # Unknown file types are chunked like plain text
+        table_type = file_type if file_type in _BASE_RECOMMENDATIONS else 'txt'
+        strategy, chunk_size, overlap, confidence, reasoning = self._strategy_table[
+            (table_type, structure_analysis['structure'], complexity_analysis['complexity'])
+        ]
+        
+        # Adjust for content length
+        if content_length < 5000:
+            chunk_size = min(chunk_size, max(1000, content_length // 3))
+        elif content_length > 100000:
+            chunk_size = int(chunk_size * 1.3)
         
-        base_rec = base_recommendations.get(file_type, base_recommendations['txt'])
+        return {
+            'strategy': strategy,
+            'chunk_size': chunk_size,
+            'overlap': overlap,
+            'confidence': confidence,
+            'reasoning': reasoning
+        }
+    
+    def _build_strategy_entry(
+        self,
+        file_type: str,
+        structure: DocumentStructure,
+        complexity: ContentComplexity
+    ) -> Tuple[str, int, int, float, str]:
+        """Strategy, chunk size, overlap, confidence and reasoning before length scaling"""
+        base_rec = _BASE_RECOMMENDATIONS[file_type]
         
         # Adjust based on structure
         if structure in [DocumentStructure.HIGHLY_STRUCTURED, DocumentStructure.STRUCTURED]:
@@ -276,7 +412,7 @@ class VexelContentAnalyzer:
             strategy = base_rec['strategy']
             confidence_boost = 0.0
         
-        # Adjust chunk size based on complexity and content length
+        # Adjust chunk size based on complexity
         chunk_size = base_rec['chunk_size']
         overlap = base_rec['overlap']
         
@@ -287,12 +423,6 @@ class VexelContentAnalyzer:
             chunk_size = int(chunk_size * 1.2)  # Larger chunks for simple content
             overlap = int(overlap * 0.8)  # Less overlap needed
         
-        # Adjust for content length
-        if content_length < 5000:
-            chunk_size = min(chunk_size, max(1000, content_length // 3))
-        elif content_length > 100000:
-            chunk_size = int(chunk_size * 1.3)
-        
         # Calculate confidence score
         base_confidence = 0.7
         structure_confidence = {
@@ -305,13 +435,8 @@ class VexelContentAnalyzer:
         confidence = min(0.95, base_confidence + confidence_boost + 
                         (structure_confidence[structure] - 0.7))
         
-        return {
-            'strategy': strategy,
-            'chunk_size': chunk_size,
-            'overlap': overlap,
-            'confidence': confidence,
-            'reasoning': self._generate_reasoning(file_type, structure, complexity, strategy)
-        }
+        reasoning = self._generate_reasoning(file_type, structure, complexity, strategy)
+        return strategy, chunk_size, overlap, confidence, reasoning
     
     def _generate_reasoning(
         self, 
@@ -378,16 +503,7 @@ class VexelContentAnalyzer:
     
     def _get_speed_rating(self, processing_time: float) -> str:
         """Get human-readable speed rating"""
-        if processing_time < 1:
-            return "Very Fast"
-        elif processing_time < 5:
-            return "Fast"
-        elif processing_time < 15:
-            return "Moderate"
-        elif processing_time < 30:
-            return "Slow"
-        else:
-            return "Very Slow"
+        return _SPEED_RATINGS[bisect.bisect_right(_SPEED_THRESHOLDS, processing_time)]
     
     def _estimate_memory_usage(self, content_length: int, strategy: str) -> str:
         """Estimate memory usage"""
@@ -402,15 +518,7 @@ class VexelContentAnalyzer:
         }
         
         estimated_mb = (content_length * multipliers.get(strategy, 1.5)) / (1024 * 1024)
-        
-        if estimated_mb < 10:
-            return "Low (< 10MB)"
-        elif estimated_mb < 50:
-            return "Moderate (10-50MB)"
-        elif estimated_mb < 200:
-            return "High (50-200MB)"
-        else:
-            return "Very High (> 200MB)"
+        return _MEMORY_RATINGS[bisect.bisect_right(_MEMORY_THRESHOLDS_MB, estimated_mb)]
     
     def _get_default_analysis(self, content: str, file_type: str) -> ContentAnalysisResult:
         """Return safe default analysis when analysis fails"""
@@ -3,9 +3,15 @@ Vexel Performance Monitoring Service
 Tracks chunking performance metrics and provides optimization insights
 """
 
+import bisect
+import heapq
 import logging
+import math
 import time
-from typing import Dict, Any, List, Optional
+from collections import Counter, deque
+from itertools import islice
+from operator import attrgetter
+from typing import Deque, Dict, Any, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -13,6 +19,22 @@ import statistics
 
 logger = logging.getLogger(__name__)
 
+# Metric times are kept as integer nanoseconds since the Unix epoch
+_NS_PER_HOUR = 3_600_000_000_000
+_EPOCH = datetime(1970, 1, 1)
+_TIMESTAMP_NS = attrgetter("timestamp_ns")
+
+
+def _mean(values: Sequence[float]) -> float:
+    """Mean of a non-empty sequence, summed in C by math.fsum"""
+    return math.fsum(values) / len(values)
+
+
+def _stdev(values: Sequence[float]) -> float:
+    """Sample standard deviation of at least two values"""
+    mean = _mean(values)
+    return math.sqrt(math.fsum((value - mean) ** 2 for value in values) / (len(values) - 1))
+
 
 class MetricType(str, Enum):
     """Types of performance metrics"""
@@ -24,21 +46,56 @@ class MetricType(str, Enum):
     USER_SATISFACTION = "user_satisfaction"
 
 
-@dataclass
+# Metric types a performance summary reports on
+_SUMMARY_METRIC_TYPES = (
+    MetricType.PROCESSING_TIME,
+    MetricType.CHUNK_COUNT,
+    MetricType.CHUNK_SIZE,
+    MetricType.ERROR_RATE,
+)
+
+
+@dataclass(slots=True)
 class PerformanceMetric:
     """Individual performance metric"""
     metric_type: MetricType
     value: float
-    timestamp: datetime
+    timestamp_ns: int
     file_type: str
     chunking_strategy: str
     user_tier: str
     file_size_bytes: int
     chunk_count: int
     metadata: Dict[str, Any]
+    
+    @property
+    def timestamp(self) -> datetime:
+        """When the metric was recorded, as a naive UTC datetime"""
+        return _EPOCH + timedelta(microseconds=self.timestamp_ns // 1000)
+    
+    def reset(
+        self,
+        value: float,
+        timestamp_ns: int,
+        file_type: str,
+        chunking_strategy: str,
+        user_tier: str,
+        file_size_bytes: int,
+        chunk_count: int,
+        metadata: Dict[str, Any]
+    ):
+        """Overwrite this metric in place with a new reading of the same type"""
+        self.value = value
+        self.timestamp_ns = timestamp_ns
+        self.file_type = file_type
+        self.chunking_strategy = chunking_strategy
+        self.user_tier = user_tier
+        self.file_size_bytes = file_size_bytes
+        self.chunk_count = chunk_count
+        self.metadata = metadata
 
 
-@dataclass
+@dataclass(slots=True)
 class PerformanceInsight:
     """Performance insight and recommendation"""
     insight_type: str
@@ -51,16 +108,54 @@ class PerformanceInsight:
     created_at: datetime
 
 
+@dataclass(slots=True)
+class StrategyTotals:
+    """Running totals of the processing-time metrics of one strategy"""
+    operations: int = 0
+    processing_time: float = 0.0
+    file_size_bytes: int = 0
+    chunk_count: int = 0
+    
+    def add(self, metric: PerformanceMetric, sign: int = 1):
+        """Add a processing-time metric, or remove it with sign=-1"""
+        self.operations += sign
+        self.processing_time += sign * metric.value
+        self.file_size_bytes += sign * metric.file_size_bytes
+        self.chunk_count += sign * metric.chunk_count
+    
+    def merge(self, other: "StrategyTotals"):
+        """Fold another set of totals into this one"""
+        self.operations += other.operations
+        self.processing_time += other.processing_time
+        self.file_size_bytes += other.file_size_bytes
+        self.chunk_count += other.chunk_count
+
+
 class VexelPerformanceMonitor:
     """
     Service for monitoring and analyzing chunking performance
     """
     
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 30.0):
         """Initialize the performance monitor"""
-        self.metrics: List[PerformanceMetric] = []
+        # The dashboard is served from cache for `cache_ttl` seconds; new metrics
+        # show up once it expires rather than invalidating it on every insert
+        self.cache_ttl = cache_ttl
+        self._dashboard_cache: Optional[Tuple[Dict[str, Any], float]] = None
         self.insights: List[PerformanceInsight] = []
-        self.max_metrics = 10000  # Keep last 10k metrics in memory
+        self.max_metrics = 10000  # Keep the last 10k metrics of each type in memory
+        # One append-ordered ring buffer per type, so a query only walks the types it reads
+        self.metrics_by_type: Dict[MetricType, Deque[PerformanceMetric]] = {
+            metric_type: deque(maxlen=self.max_metrics) for metric_type in MetricType
+        }
+        # Totals of the buffered processing-time metrics by strategy, file type and user tier,
+        # kept in step with the buffer so the strategy and tier views never rescan it
+        self.strategy_totals: Dict[Tuple[str, str, str], StrategyTotals] = {}
+    
+    @property
+    def metric_count(self) -> int:
+        """Number of metrics currently held across all types"""
+        return sum(len(metrics) for metrics in self.metrics_by_type.values())
     
     def record_processing_metric(
         self,
@@ -80,6 +175,8 @@ class VexelPerformanceMonitor:
             "success": success,
             "processing_speed_bytes_per_second": file_size_bytes / max(processing_time, 0.001)
         })
+        # Every metric of this reading shares one timestamp
+        timestamp_ns = time.time_ns()
         
         # Record processing time
         self._add_metric(
@@ -90,7 +187,8 @@ class VexelPerformanceMonitor:
             user_tier,
             file_size_bytes,
             chunk_count,
-            metadata
+            metadata,
+            timestamp_ns
         )
         
         # Record chunk count
@@ -102,7 +200,8 @@ class VexelPerformanceMonitor:
             user_tier,
             file_size_bytes,
             chunk_count,
-            metadata
+            metadata,
+            timestamp_ns
         )
         
         # Record average chunk size
@@ -115,7 +214,8 @@ class VexelPerformanceMonitor:
             user_tier,
             file_size_bytes,
             chunk_count,
-            metadata
+            metadata,
+            timestamp_ns
         )
         
         # Record error if processing failed
@@ -128,7 +228,8 @@ class VexelPerformanceMonitor:
                 user_tier,
                 file_size_bytes,
                 chunk_count,
-                metadata
+                metadata,
+                timestamp_ns
             )
     
     def _add_metric(
@@ -140,26 +241,75 @@ class VexelPerformanceMonitor:
         user_tier: str,
         file_size_bytes: int,
         chunk_count: int,
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        timestamp_ns: int
     ):
         """Add a metric to the collection"""
-        metric = PerformanceMetric(
-            metric_type=metric_type,
-            value=value,
-            timestamp=datetime.utcnow(),
-            file_type=file_type,
-            chunking_strategy=chunking_strategy,
-            user_tier=user_tier,
-            file_size_bytes=file_size_bytes,
-            chunk_count=chunk_count,
-            metadata=metadata
-        )
-        
-        self.metrics.append(metric)
+        metrics = self.metrics_by_type[metric_type]
+        
+        if len(metrics) == metrics.maxlen:
+            # The buffer is full, so the oldest metric is recycled for the new reading
+            metric = metrics.popleft()
+            if metric_type == MetricType.PROCESSING_TIME:
+                self._update_strategy_totals(metric, -1)
+            metric.reset(
+                value, timestamp_ns, file_type, chunking_strategy, user_tier,
+                file_size_bytes, chunk_count, metadata
+            )
+        else:
+            metric = PerformanceMetric(
+                metric_type=metric_type,
+                value=value,
+                timestamp_ns=timestamp_ns,
+                file_type=file_type,
+                chunking_strategy=chunking_strategy,
+                user_tier=user_tier,
+                file_size_bytes=file_size_bytes,
+                chunk_count=chunk_count,
+                metadata=metadata
+            )
         
-        # Keep only recent metrics
-        if len(self.metrics) > self.max_metrics:
-            self.metrics = self.metrics[-self.max_metrics:]
+        if metric_type == MetricType.PROCESSING_TIME:
+            self._update_strategy_totals(metric, 1)
+        metrics.append(metric)
+    
+    def _update_strategy_totals(self, metric: PerformanceMetric, sign: int):
+        """Add a processing-time metric to its strategy totals, or remove it with sign=-1"""
+        key = (metric.chunking_strategy, metric.file_type, metric.user_tier)
+        totals = self.strategy_totals.get(key)
+        if totals is None:
+            totals = self.strategy_totals[key] = StrategyTotals()
+        totals.add(metric, sign)
+        if not totals.operations:
+            del self.strategy_totals[key]
+    
+    def _recent_metrics(self, metric_type: MetricType, cutoff_ns: int) -> List[PerformanceMetric]:
+        """Metrics of one type recorded at or after the cutoff, oldest first"""
+        # Metrics are appended in time order, so the window is a suffix of the buffer
+        # that a binary search finds; it is then copied from the right end in C
+        metrics = self.metrics_by_type[metric_type]
+        window_size = len(metrics) - bisect.bisect_left(metrics, cutoff_ns, key=_TIMESTAMP_NS)
+        recent = list(islice(reversed(metrics), window_size))
+        recent.reverse()
+        return recent
+    
+    def _select_metrics(
+        self,
+        metric_type: MetricType,
+        cutoff_ns: int,
+        file_type: Optional[str] = None,
+        chunking_strategy: Optional[str] = None,
+        user_tier: Optional[str] = None
+    ) -> List[PerformanceMetric]:
+        """Metrics of one type within the time window that match the given criteria"""
+        metrics = self._recent_metrics(metric_type, cutoff_ns)
+        if file_type:
+            metrics = [m for m in metrics if m.file_type == file_type]
+        if chunking_strategy:
+            metrics = [m for m in metrics if m.chunking_strategy == chunking_strategy]
+        if user_tier:
+            metrics = [m for m in metrics if m.user_tier == user_tier]
+        return metrics
     
     def get_performance_summary(
         self,
@@ -171,27 +321,37 @@ class VexelPerformanceMonitor:
         """Get performance summary for specified criteria"""
         
         # Filter metrics by time window and criteria
-        cutoff_time = datetime.utcnow() - timedelta(hours=time_window_hours)
-        filtered_metrics = [
-            m for m in self.metrics 
-            if m.timestamp >= cutoff_time
-        ]
-        
-        if file_type:
-            filtered_metrics = [m for m in filtered_metrics if m.file_type == file_type]
-        if chunking_strategy:
-            filtered_metrics = [m for m in filtered_metrics if m.chunking_strategy == chunking_strategy]
-        if user_tier:
-            filtered_metrics = [m for m in filtered_metrics if m.user_tier == user_tier]
+        cutoff_ns = time.time_ns() - time_window_hours * _NS_PER_HOUR
+        windows = {
+            metric_type: self._select_metrics(
+                metric_type, cutoff_ns, file_type, chunking_strategy, user_tier
+            )
+            for metric_type in _SUMMARY_METRIC_TYPES
+        }
+        return self._summarize(windows, time_window_hours, file_type, chunking_strategy, user_tier)
+    
+    def _summarize(
+        self,
+        windows: Dict[MetricType, List[PerformanceMetric]],
+        time_window_hours: int,
+        file_type: Optional[str] = None,
+        chunking_strategy: Optional[str] = None,
+        user_tier: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Summarize the metrics already selected for each type within a time window"""
+        processing_metrics = windows[MetricType.PROCESSING_TIME]
+        chunk_count_metrics = windows[MetricType.CHUNK_COUNT]
+        chunk_size_metrics = windows[MetricType.CHUNK_SIZE]
+        error_metrics = windows[MetricType.ERROR_RATE]
         
-        if not filtered_metrics:
+        if not (processing_metrics or chunk_count_metrics or chunk_size_metrics or error_metrics):
             return {"message": "No metrics found for specified criteria"}
         
         # Calculate summary statistics
-        processing_times = [m.value for m in filtered_metrics if m.metric_type == MetricType.PROCESSING_TIME]
-        chunk_counts = [m.value for m in filtered_metrics if m.metric_type == MetricType.CHUNK_COUNT]
-        chunk_sizes = [m.value for m in filtered_metrics if m.metric_type == MetricType.CHUNK_SIZE]
-        error_count = len([m for m in filtered_metrics if m.metric_type == MetricType.ERROR_RATE])
+        processing_times = [m.value for m in processing_metrics]
+        chunk_counts = [m.value for m in chunk_count_metrics]
+        chunk_sizes = [m.value for m in chunk_size_metrics]
+        error_count = len(error_metrics)
         
         summary = {
             "time_window_hours": time_window_hours,
@@ -207,16 +367,29 @@ class VexelPerformanceMonitor:
             "error_rate": error_count / max(len(processing_times), 1),
             "throughput": {
                 "operations_per_hour": len(processing_times) / max(time_window_hours, 1),
-                "avg_bytes_per_second": statistics.mean([
+                "avg_bytes_per_second": _mean([
                     m.metadata.get("processing_speed_bytes_per_second", 0) 
-                    for m in filtered_metrics 
-                    if m.metric_type == MetricType.PROCESSING_TIME
+                    for m in processing_metrics
                 ]) if processing_times else 0
             }
         }
         
         return summary
     
+    @staticmethod
+    def _with_time_window(summary: Dict[str, Any], time_window_hours: int) -> Dict[str, Any]:
+        """Relabel a summary for another time window that holds exactly the same metrics"""
+        if "message" in summary:
+            return summary
+        return {
+            **summary,
+            "time_window_hours": time_window_hours,
+            "throughput": {
+                **summary["throughput"],
+                "operations_per_hour": summary["total_operations"] / max(time_window_hours, 1)
+            }
+        }
+    
     def _calculate_stats(self, values: List[float], unit: str) -> Dict[str, Any]:
         """Calculate statistical summary for a list of values"""
         if not values:
@@ -224,48 +397,40 @@ class VexelPerformanceMonitor:
         
         return {
             "count": len(values),
-            "mean": round(statistics.mean(values), 3),
+            "mean": round(_mean(values), 3),
             "median": round(statistics.median(values), 3),
             "min": round(min(values), 3),
             "max": round(max(values), 3),
-            "std_dev": round(statistics.stdev(values), 3) if len(values) > 1 else 0,
+            "std_dev": round(_stdev(values), 3) if len(values) > 1 else 0,
             "unit": unit
         }
     
     def get_strategy_comparison(self, file_type: Optional[str] = None) -> Dict[str, Any]:
         """Compare performance across different chunking strategies"""
         
-        # Filter by file type if specified
-        metrics = self.metrics
-        if file_type:
-            metrics = [m for m in metrics if m.file_type == file_type]
-        
-        # Group by strategy
-        strategy_metrics = {}
-        for metric in metrics:
-            if metric.metric_type == MetricType.PROCESSING_TIME:
-                strategy = metric.chunking_strategy
-                if strategy not in strategy_metrics:
-                    strategy_metrics[strategy] = []
-                strategy_metrics[strategy].append(metric)
+        # Combine the running totals by strategy, filtering by file type if specified
+        strategy_totals: Dict[str, StrategyTotals] = {}
+        for (strategy, metric_file_type, _), totals in self.strategy_totals.items():
+            if file_type and metric_file_type != file_type:
+                continue
+            if strategy not in strategy_totals:
+                strategy_totals[strategy] = StrategyTotals()
+            strategy_totals[strategy].merge(totals)
         
         # Calculate comparison
         comparison = {}
-        for strategy, strategy_metrics_list in strategy_metrics.items():
-            processing_times = [m.value for m in strategy_metrics_list]
-            file_sizes = [m.file_size_bytes for m in strategy_metrics_list]
-            chunk_counts = [m.chunk_count for m in strategy_metrics_list]
+        for strategy, totals in strategy_totals.items():
+            avg_time = totals.processing_time / totals.operations
+            avg_size = totals.file_size_bytes / totals.operations
+            avg_chunks = totals.chunk_count / totals.operations
             
-            if processing_times:
-                comparison[strategy] = {
-                    "operations": len(processing_times),
-                    "avg_processing_time": round(statistics.mean(processing_times), 3),
-                    "avg_file_size_mb": round(statistics.mean(file_sizes) / (1024 * 1024), 2),
-                    "avg_chunks": round(statistics.mean(chunk_counts), 1),
-                    "efficiency_score": self._calculate_efficiency_score(
-                        processing_times, file_sizes, chunk_counts
-                    )
-                }
+            comparison[strategy] = {
+                "operations": totals.operations,
+                "avg_processing_time": round(avg_time, 3),
+                "avg_file_size_mb": round(avg_size / (1024 * 1024), 2),
+                "avg_chunks": round(avg_chunks, 1),
+                "efficiency_score": self._calculate_efficiency_score(avg_time, avg_size, avg_chunks)
+            }
         
         return {
             "file_type": file_type or "all",
@@ -275,19 +440,11 @@ class VexelPerformanceMonitor:
     
     def _calculate_efficiency_score(
         self, 
-        processing_times: List[float], 
-        file_sizes: List[int], 
-        chunk_counts: List[int]
+        avg_time: float, 
+        avg_size: float, 
+        avg_chunks: float
     ) -> float:
         """Calculate efficiency score for a strategy (higher is better)"""
-        if not processing_times:
-            return 0.0
-        
-        # Normalize metrics (lower processing time is better, reasonable chunk count is better)
-        avg_time = statistics.mean(processing_times)
-        avg_size = statistics.mean(file_sizes)
-        avg_chunks = statistics.mean(chunk_counts)
-        
         # Calculate throughput (bytes per second)
         throughput = avg_size / max(avg_time, 0.001)
         
@@ -311,10 +468,11 @@ class VexelPerformanceMonitor:
         strategy_comparison = self.get_strategy_comparison()
         if strategy_comparison["strategies"]:
             best_strategy = strategy_comparison["best_strategy"]
-            worst_strategies = sorted(
+            worst_strategies = heapq.nsmallest(
+                2,
                 strategy_comparison["strategies"].items(),
                 key=lambda x: x[1]["efficiency_score"]
-            )[:2]
+            )
             
             if len(worst_strategies) > 0 and best_strategy:
                 insights.append(PerformanceInsight(
@@ -325,20 +483,18 @@ class VexelPerformanceMonitor:
                     recommendation=f"Consider using '{best_strategy}' strategy for better performance",
                     confidence=0.8,
                     impact_level="medium",
-                    data_points=len(self.metrics),
+                    data_points=self.metric_count,
                     created_at=datetime.utcnow()
                 ))
         
         # Insight 2: Processing time trends
-        recent_metrics = [
-            m for m in self.metrics 
-            if m.metric_type == MetricType.PROCESSING_TIME and 
-               m.timestamp >= datetime.utcnow() - timedelta(hours=24)
-        ]
+        recent_metrics = self._recent_metrics(
+            MetricType.PROCESSING_TIME, time.time_ns() - 24 * _NS_PER_HOUR
+        )
         
         if len(recent_metrics) > 10:
             processing_times = [m.value for m in recent_metrics]
-            avg_time = statistics.mean(processing_times)
+            avg_time = _mean(processing_times)
             
             if avg_time > 10:  # More than 10 seconds average
                 insights.append(PerformanceInsight(
@@ -353,11 +509,9 @@ class VexelPerformanceMonitor:
                 ))
         
         # Insight 3: Error rate analysis
-        error_metrics = [
-            m for m in self.metrics 
-            if m.metric_type == MetricType.ERROR_RATE and 
-               m.timestamp >= datetime.utcnow() - timedelta(hours=24)
-        ]
+        error_metrics = self._recent_metrics(
+            MetricType.ERROR_RATE, time.time_ns() - 24 * _NS_PER_HOUR
+        )
         
         if error_metrics:
             error_rate = len(error_metrics) / max(len(recent_metrics), 1)
@@ -378,31 +532,64 @@ class VexelPerformanceMonitor:
     
     def get_user_tier_analysis(self) -> Dict[str, Any]:
         """Analyze performance by user tier"""
-        tier_metrics = {}
-        
-        for metric in self.metrics:
-            if metric.metric_type == MetricType.PROCESSING_TIME:
-                tier = metric.user_tier
-                if tier not in tier_metrics:
-                    tier_metrics[tier] = []
-                tier_metrics[tier].append(metric)
+        # Combine the running totals by tier, counting operations per strategy on the way
+        tier_totals: Dict[str, StrategyTotals] = {}
+        tier_strategy_counts: Dict[str, Counter] = {}
+        for (strategy, _, tier), totals in self.strategy_totals.items():
+            if tier not in tier_totals:
+                tier_totals[tier] = StrategyTotals()
+                tier_strategy_counts[tier] = Counter()
+            tier_totals[tier].merge(totals)
+            tier_strategy_counts[tier][strategy] += totals.operations
         
         analysis = {}
-        for tier, metrics in tier_metrics.items():
-            processing_times = [m.value for m in metrics]
-            strategies_used = list(set(m.chunking_strategy for m in metrics))
+        for tier, totals in tier_totals.items():
+            strategy_counts = tier_strategy_counts[tier]
             
             analysis[tier] = {
-                "operations": len(metrics),
-                "avg_processing_time": round(statistics.mean(processing_times), 3) if processing_times else 0,
-                "strategies_used": strategies_used,
-                "most_common_strategy": max(
-                    set(m.chunking_strategy for m in metrics),
-                    key=lambda x: sum(1 for m in metrics if m.chunking_strategy == x)
-                ) if metrics else None
+                "operations": totals.operations,
+                "avg_processing_time": round(totals.processing_time / totals.operations, 3),
+                "strategies_used": list(strategy_counts),
+                "most_common_strategy": strategy_counts.most_common(1)[0][0]
             }
         
         return analysis
+    
+    def get_dashboard(self) -> Dict[str, Any]:
+        """Get comprehensive performance dashboard data, cached for `cache_ttl` seconds"""
+        now = time.monotonic()
+        if self._dashboard_cache is not None and now - self._dashboard_cache[1] < self.cache_ttl:
+            return self._dashboard_cache[0]
+        
+        # The week's metrics are selected once; the last day is a suffix of each type's window
+        now_ns = time.time_ns()
+        week_windows = {
+            metric_type: self._recent_metrics(metric_type, now_ns - 168 * _NS_PER_HOUR)
+            for metric_type in _SUMMARY_METRIC_TYPES
+        }
+        day_cutoff_ns = now_ns - 24 * _NS_PER_HOUR
+        day_windows = {
+            metric_type: metrics[bisect.bisect_left(metrics, day_cutoff_ns, key=_TIMESTAMP_NS):]
+            for metric_type, metrics in week_windows.items()
+        }
+        
+        summary_7d = self._summarize(week_windows, 168)  # 7 days
+        if all(len(day_windows[t]) == len(week_windows[t]) for t in _SUMMARY_METRIC_TYPES):
+            # Nothing buffered is older than a day, so the statistics are the same
+            summary_24h = self._with_time_window(summary_7d, 24)
+        else:
+            summary_24h = self._summarize(day_windows, 24)
+        
+        dashboard = {
+            "summary_24h": summary_24h,
+            "summary_7d": summary_7d,
+            "strategy_comparison": self.get_strategy_comparison(),
+            "user_tier_analysis": self.get_user_tier_analysis(),
+            "recent_insights": self.generate_insights()[-5:],  # Last 5 insights
+            "total_metrics": self.metric_count
+        }
+        self._dashboard_cache = (dashboard, now)
+        return dashboard
 
 
 # Global instance for use across the application
@@ -434,11 +621,5 @@ def record_processing_performance(
 
 def get_performance_dashboard() -> Dict[str, Any]:
     """Get comprehensive performance dashboard data"""
-    return {
-        "summary_24h": performance_monitor.get_performance_summary(24),
-        "summary_7d": performance_monitor.get_performance_summary(168),  # 7 days
-        "strategy_comparison": performance_monitor.get_strategy_comparison(),
-        "user_tier_analysis": performance_monitor.get_user_tier_analysis(),
-        "recent_insights": performance_monitor.generate_insights()[-5:],  # Last 5 insights
-        "total_metrics": len(performance_monitor.metrics)
-    }
+    # Shallow copy so callers can add keys without touching the cached dashboard
+    return dict(performance_monitor.get_dashboard())
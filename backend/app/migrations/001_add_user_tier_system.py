@@ -7,11 +7,19 @@ import asyncio
 import os
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import UpdateOne
+from pymongo import IndexModel, UpdateOne
+from pymongo.errors import OperationFailure
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Users are read and updated this many at a time, so memory stays flat however large the collection is
+MIGRATION_BATCH_SIZE = 1000
+
+# Email domains whose users start on the enterprise tier, subdomains included
+ENTERPRISE_DOMAINS = ("company.com", "enterprise.org")  # Add your enterprise domains
+_ENTERPRISE_DOMAIN_SUFFIXES = tuple(f".{domain}" for domain in ENTERPRISE_DOMAINS)
+
 
 class UserTierMigration:
     """Migration to add user tier system to existing users"""
@@ -36,27 +44,48 @@ class UserTierMigration:
     
     async def check_migration_needed(self) -> bool:
         """Check if migration is needed by looking for users without tier field"""
-        users_without_tier = await self.db.user.count_documents({"tier": {"$exists": False}})
-        total_users = await self.db.user.count_documents({})
+        # One matching user is enough to decide; exact counts are left to _verify_migration
+        user_without_tier = await self.db.user.find_one({"tier": {"$exists": False}}, {"_id": 1})
+        total_users = await self.db.user.estimated_document_count()
 
-        logger.info(f"Found {users_without_tier} users without tier field out of {total_users} total users")
-        return users_without_tier > 0
+        status = "found" if user_without_tier is not None else "not found"
+        logger.info(f"Users without tier field {status} among about {total_users} total users")
+        return user_without_tier is not None
     
     async def backup_users(self) -> str:
         """Create backup of users collection before migration"""
         backup_collection = f"users_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        # Copy all users to backup collection
-        users = []
-        async for user in self.db.user.find({}):
-            users.append(user)
+        # Copy all users to backup collection on the server, so no document crosses the network
+        try:
+            await self.db.user.aggregate([{"$out": backup_collection}]).to_list(None)
+            backed_up = await self.db[backup_collection].estimated_document_count()
+        except OperationFailure as e:
+            logger.warning(f"Server-side backup not permitted, copying users through the client: {str(e)}")
+            backed_up = await self._copy_users(backup_collection)
         
-        if users:
-            await self.db[backup_collection].insert_many(users)
-            logger.info(f"Created backup collection: {backup_collection} with {len(users)} users")
+        if backed_up:
+            logger.info(f"Created backup collection: {backup_collection} with {backed_up} users")
         
         return backup_collection
     
+    async def _copy_users(self, backup_collection: str) -> int:
+        """Copy the users collection a batch at a time, returning the number of users copied"""
+        copied = 0
+        batch = []
+        async for user in self.db.user.find({}, batch_size=MIGRATION_BATCH_SIZE):
+            batch.append(user)
+            if len(batch) >= MIGRATION_BATCH_SIZE:
+                await self.db[backup_collection].insert_many(batch)
+                copied += len(batch)
+                batch = []
+        
+        if batch:
+            await self.db[backup_collection].insert_many(batch)
+            copied += len(batch)
+        
+        return copied
+    
     async def migrate_users(self) -> dict:
         """Migrate existing users to add tier system fields"""
         migration_stats = {
@@ -69,21 +98,19 @@ class UserTierMigration:
         # Get current timestamp
         now = datetime.utcnow()
         
-        # Find users that need migration
-        users_to_migrate = []
-        async for user in self.db.user.find({"tier": {"$exists": False}}):
-            users_to_migrate.append(user)
-        
-        migration_stats["total_users"] = len(users_to_migrate)
-        
-        if not users_to_migrate:
-            logger.info("No users need migration")
-            return migration_stats
+        # Stream the users that need migration, fetching only the fields used to pick a tier
+        cursor = self.db.user.find(
+            {"tier": {"$exists": False}},
+            {"_id": 1, "is_superuser": 1, "email": 1, "created": 1},
+            batch_size=MIGRATION_BATCH_SIZE
+        )
         
-        # Prepare bulk update operations
+        # Prepare bulk update operations, writing them out a batch at a time
         bulk_operations = []
+        batch_written = False
         
-        for user in users_to_migrate:
+        async for user in cursor:
+            migration_stats["total_users"] += 1
             try:
                 # Determine initial tier based on user characteristics
                 initial_tier = self._determine_initial_tier(user)
@@ -113,23 +140,38 @@ class UserTierMigration:
                 logger.error(error_msg)
                 migration_stats["errors"].append(error_msg)
                 migration_stats["skipped_users"] += 1
+            
+            if len(bulk_operations) >= MIGRATION_BATCH_SIZE:
+                batch_written |= await self._write_batch(bulk_operations, migration_stats)
+                bulk_operations = []
         
-        # Execute bulk operations
+        if not migration_stats["total_users"]:
+            logger.info("No users need migration")
+            return migration_stats
+        
+        # Execute the remaining bulk operations
         if bulk_operations:
-            try:
-                result = await self.db.user.bulk_write(bulk_operations)
-                logger.info(f"Bulk update completed: {result.modified_count} users updated")
-                
-                # Verify migration
-                await self._verify_migration()
-                
-            except Exception as e:
-                error_msg = f"Bulk update failed: {str(e)}"
-                logger.error(error_msg)
-                migration_stats["errors"].append(error_msg)
+            batch_written |= await self._write_batch(bulk_operations, migration_stats)
+        
+        # Verify migration
+        if batch_written:
+            await self._verify_migration()
         
         return migration_stats
     
+    async def _write_batch(self, bulk_operations: list, migration_stats: dict) -> bool:
+        """Apply one batch of user updates, returning whether the write succeeded"""
+        try:
+            # Unordered, so one failing update does not stop the rest of the batch
+            result = await self.db.user.bulk_write(bulk_operations, ordered=False)
+            logger.info(f"Bulk update completed: {result.modified_count} users updated")
+            return True
+        except Exception as e:
+            error_msg = f"Bulk update failed: {str(e)}"
+            logger.error(error_msg)
+            migration_stats["errors"].append(error_msg)
+            return False
+    
     def _determine_initial_tier(self, user: dict) -> str:
         """Determine initial tier for existing user based on characteristics"""
         
@@ -143,9 +185,10 @@ class UserTierMigration:
         
         # Check email domain for enterprise users (example logic)
         email = user.get("email", "")
-        enterprise_domains = ["company.com", "enterprise.org"]  # Add your enterprise domains
+        domain = email.rpartition("@")[2].lower()
         
-        if any(domain in email for domain in enterprise_domains):
+        # One endswith over all suffixes matches the domain itself or any of its subdomains
+        if f".{domain}".endswith(_ENTERPRISE_DOMAIN_SUFFIXES):
             return "enterprise"
         
         # Check if user has been very active (example: created recently might be premium trial)
@@ -180,12 +223,28 @@ class UserTierMigration:
             ("monthly_reset_date", 1)
         ]
         
-        for field, direction in indexes_to_create:
-            try:
-                await self.db.user.create_index([(field, direction)])
-                logger.info(f"Created index on user.{field}")
-            except Exception as e:
-                logger.warning(f"Failed to create index on user.{field}: {str(e)}")
+        # One createIndexes command builds every index in a single collection scan
+        try:
+            await self.db.user.create_indexes(
+                [IndexModel([(field, direction)]) for field, direction in indexes_to_create]
+            )
+            logger.info(f"Created indexes on user: {', '.join(field for field, _ in indexes_to_create)}")
+            return
+        except Exception as e:
+            logger.warning(f"Failed to create tier indexes together, retrying one by one: {str(e)}")
+        
+        # Build them concurrently instead, so the ones that can be created still are
+        await asyncio.gather(*(
+            self._create_index(field, direction) for field, direction in indexes_to_create
+        ))
+    
+    async def _create_index(self, field: str, direction: int):
+        """Create a single index on the user collection, logging rather than raising on failure"""
+        try:
+            await self.db.user.create_index([(field, direction)])
+            logger.info(f"Created index on user.{field}")
+        except Exception as e:
+            logger.warning(f"Failed to create index on user.{field}: {str(e)}")
     
     async def run_migration(self, create_backup: bool = True) -> dict:
         """Run the complete migration process"""
@@ -7,7 +7,8 @@ from app.services.content_analyzer import (
     VexelContentAnalyzer,
     ContentComplexity,
     DocumentStructure,
-    ContentAnalysisResult
+    ContentAnalysisResult,
+    SAMPLE_THRESHOLD
 )
 
 
@@ -312,6 +313,36 @@ class TestVexelContentAnalyzer:
         assert self.analyzer._get_speed_rating(25.0) == "Slow"
         assert self.analyzer._get_speed_rating(35.0) == "Very Slow"
 
+    def test_repeat_analysis_is_cached(self):
+        """Test that re-analyzing the same content reuses the cached result"""
+        content = "# Title\n\n- Item 1\n- Item 2\n\nSome text here."
+
+        first = self.analyzer.analyze_content(content, "markdown", "first.md")
+        second = self.analyzer.analyze_content(content, "markdown", "second.md")
+
+        assert len(self.analyzer._analysis_cache) == 1
+        assert second.recommended_strategy == first.recommended_strategy
+        assert second.analysis_details["structure_analysis"] is first.analysis_details["structure_analysis"]
+        assert first.analysis_details["filename"] == "first.md"
+        assert second.analysis_details["filename"] == "second.md"
+
+        # A different file type is analyzed separately
+        self.analyzer.analyze_content(content, "txt", "first.txt")
+        assert len(self.analyzer._analysis_cache) == 2
+
+    def test_large_document_is_sampled(self):
+        """Test that very large documents are analyzed on a sample"""
+        content = "- Item with some text\n" * (SAMPLE_THRESHOLD // 20)
+
+        result = self.analyzer.analyze_content(content, "txt", "large.txt")
+
+        assert result.content_length == len(content)
+        assert result.analysis_details["sampled_length"] < len(content)
+        assert result.structure == DocumentStructure.HIGHLY_STRUCTURED
+
+        small = self.analyzer.analyze_content("Short text.", "txt", "small.txt")
+        assert small.analysis_details["sampled_length"] == len("Short text.")
+
 
 class TestContentAnalysisIntegration:
     """Integration tests for content analysis"""
@@ -0,0 +1,57 @@
+"""
+Unit tests for request bodies parsed by json_body
+"""
+
+from typing import List
+from unittest.mock import patch
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.api.deps import add_json_body_schemas, json_body, json_body_openapi
+
+
+class Item(BaseModel):
+    name: str
+
+
+class Order(BaseModel):
+    items: List[Item]
+
+
+def _app():
+    app = FastAPI()
+
+    @app.post("/orders", openapi_extra=json_body_openapi(Order))
+    async def create_order(order: Order = Depends(json_body(Order))):
+        return {"count": len(order.items)}
+
+    return app
+
+
+class TestJsonBodyOpenAPI:
+    """Test the OpenAPI description of json_body routes"""
+
+    def test_route_definition_does_not_build_schema(self):
+        with patch.object(Order, "model_json_schema") as build:
+            _app()
+
+        build.assert_not_called()
+
+    def test_nested_models_resolve_under_components(self):
+        app = _app()
+        schema = add_json_body_schemas(app.openapi())
+
+        body = schema["paths"]["/orders"]["post"]["requestBody"]["content"]["application/json"]["schema"]
+        assert body == {"$ref": "#/components/schemas/Order"}
+        components = schema["components"]["schemas"]
+        assert components["Order"]["properties"]["items"]["items"] == {"$ref": "#/components/schemas/Item"}
+        assert "Item" in components
+        assert "$defs" not in components["Order"]
+
+    def test_body_is_validated(self):
+        client = TestClient(_app())
+
+        assert client.post("/orders", json={"items": [{"name": "a"}]}).json() == {"count": 1}
+        assert client.post("/orders", json={"items": [{}]}).status_code == 422
@@ -0,0 +1,88 @@
+"""
+Unit tests for the performance monitor's running strategy totals
+"""
+
+import random
+from collections import defaultdict
+
+import pytest
+
+from app.services.performance_monitor import MetricType, VexelPerformanceMonitor
+
+STRATEGIES = ["fixed", "recursive", "semantic"]
+FILE_TYPES = ["pdf", "txt", "md"]
+USER_TIERS = ["free", "premium"]
+
+
+def _readings(count, seed=0):
+    """Deterministic readings; times are multiples of 1/4 so their sums are exact"""
+    rng = random.Random(seed)
+    return [
+        {
+            "processing_time": rng.randint(1, 40) / 4,
+            "file_type": rng.choice(FILE_TYPES),
+            "chunking_strategy": rng.choice(STRATEGIES),
+            "user_tier": rng.choice(USER_TIERS),
+            "file_size_bytes": rng.randint(1_000, 5_000_000),
+            "chunk_count": rng.randint(0, 150),
+        }
+        for _ in range(count)
+    ]
+
+
+def _rescan(monitor, readings, file_type=None):
+    """Strategy comparison computed directly from the readings the buffer should hold"""
+    grouped = defaultdict(list)
+    for reading in readings:
+        if file_type and reading["file_type"] != file_type:
+            continue
+        grouped[reading["chunking_strategy"]].append(reading)
+
+    comparison = {}
+    for strategy, group in grouped.items():
+        avg_time = sum(r["processing_time"] for r in group) / len(group)
+        avg_size = sum(r["file_size_bytes"] for r in group) / len(group)
+        avg_chunks = sum(r["chunk_count"] for r in group) / len(group)
+        comparison[strategy] = {
+            "operations": len(group),
+            "avg_processing_time": round(avg_time, 3),
+            "avg_file_size_mb": round(avg_size / (1024 * 1024), 2),
+            "avg_chunks": round(avg_chunks, 1),
+            "efficiency_score": monitor._calculate_efficiency_score(avg_time, avg_size, avg_chunks),
+        }
+    return comparison
+
+
+class TestStrategyTotals:
+    """Test that the running totals follow the buffer as old metrics are evicted"""
+
+    def setup_method(self):
+        self.monitor = VexelPerformanceMonitor()
+        self.readings = _readings(self.monitor.max_metrics + 2_500)
+        for reading in self.readings:
+            self.monitor.record_processing_metric(**reading)
+        self.retained = self.readings[-self.monitor.max_metrics:]
+
+    def test_buffer_holds_latest_readings(self):
+        """Test recycled metrics carry the values of the readings that replaced them"""
+        metrics = self.monitor.metrics_by_type[MetricType.PROCESSING_TIME]
+
+        assert len(metrics) == self.monitor.max_metrics
+        assert [(m.value, m.chunking_strategy, m.file_type) for m in metrics] == [
+            (r["processing_time"], r["chunking_strategy"], r["file_type"]) for r in self.retained
+        ]
+
+    @pytest.mark.parametrize("file_type", [None, "pdf", "md"])
+    def test_comparison_matches_rescan(self, file_type):
+        """Test the strategy comparison matches one computed from the retained readings"""
+        result = self.monitor.get_strategy_comparison(file_type)
+
+        assert result["strategies"] == _rescan(self.monitor, self.retained, file_type)
+
+    def test_evicted_groups_are_dropped(self):
+        """Test totals for a group disappear once its last metric is evicted"""
+        for reading in _readings(self.monitor.max_metrics, seed=1):
+            self.monitor.record_processing_metric(**{**reading, "chunking_strategy": "fixed"})
+
+        assert set(self.monitor.get_strategy_comparison()["strategies"]) == {"fixed"}
+        assert {key[0] for key in self.monitor.strategy_totals} == {"fixed"}
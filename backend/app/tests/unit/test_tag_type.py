@@ -0,0 +1,74 @@
+"""
+Unit tests for the comma-joined tag storage type
+"""
+
+import pytest
+from odmantic import ObjectId
+from pydantic import ValidationError
+
+from app.models.workflow import WorkflowTemplate
+from app.schemas.workflow import WorkflowTemplateCreate, WorkflowTemplateUpdate
+
+
+class TestStoredTagList:
+    """Test that tags survive a round trip through the stored form"""
+
+    def _round_trip(self, tags):
+        template = WorkflowTemplate(name="Template", user_id=ObjectId(), tags=tags)
+        doc = template.model_dump_doc()
+        return doc, WorkflowTemplate.model_validate_doc(doc)
+
+    def test_tags_round_trip(self):
+        """Test tags are stored as one string and load back as a list"""
+        doc, loaded = self._round_trip(["a", "b c", "d-e"])
+
+        assert doc["tags"] == "a,b c,d-e"
+        assert loaded.tags == ["a", "b c", "d-e"]
+
+    def test_empty_tags_round_trip(self):
+        """Test an empty tag list round trips"""
+        doc, loaded = self._round_trip([])
+
+        assert doc["tags"] == ""
+        assert loaded.tags == []
+
+    def test_legacy_array_loads(self):
+        """Test documents stored before tags were joined still load"""
+        doc, _ = self._round_trip(["a"])
+        doc["tags"] = ["a", "b"]
+
+        assert WorkflowTemplate.model_validate_doc(doc).tags == ["a", "b"]
+
+    def test_legacy_array_can_be_saved_again(self):
+        """Test legacy array elements the joined form cannot hold are split on load"""
+        doc, _ = self._round_trip(["a"])
+        doc["tags"] = ["a,b", "", "c"]
+
+        loaded = WorkflowTemplate.model_validate_doc(doc)
+
+        assert loaded.tags == ["a", "b", "c"]
+        assert loaded.model_dump_doc()["tags"] == "a,b,c"
+
+    def test_model_dump_keeps_list(self):
+        """Test only the BSON document holds the joined form"""
+        template = WorkflowTemplate(name="Template", user_id=ObjectId(), tags=["a", "b"])
+
+        assert template.model_dump()["tags"] == ["a", "b"]
+        assert template.model_dump(mode="json")["tags"] == ["a", "b"]
+
+
+class TestTagListValidation:
+    """Test that API schemas reject tags the stored form cannot hold"""
+
+    @pytest.mark.parametrize("tags", [["a", "b,c"], [""]])
+    def test_create_rejects_unstorable_tags(self, tags):
+        with pytest.raises(ValidationError):
+            WorkflowTemplateCreate(name="Template", tags=tags)
+
+    @pytest.mark.parametrize("tags", [["a", "b,c"], [""]])
+    def test_update_rejects_unstorable_tags(self, tags):
+        with pytest.raises(ValidationError):
+            WorkflowTemplateUpdate(tags=tags)
+
+    def test_valid_tags_accepted(self):
+        assert WorkflowTemplateUpdate(tags=["a", "b"]).tags == ["a", "b"]
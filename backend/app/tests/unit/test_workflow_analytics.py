@@ -0,0 +1,300 @@
+"""
+Unit tests for the write-time WorkflowAnalytics aggregation
+"""
+
+import math
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from odmantic import ObjectId
+from pydantic import ValidationError
+
+from app.crud.crud_workflow import (
+    CRUDWorkflowAnalytics,
+    CRUDWorkflowExecution,
+    CRUDWorkflowStepExecution,
+    crud_workflow_analytics,
+    crud_workflow_execution,
+)
+from app.models.workflow import (
+    StepType,
+    WorkflowAnalytics,
+    WorkflowExecution,
+    WorkflowStatus,
+    WorkflowStepExecution,
+)
+from app.schemas.workflow import WorkflowStepConfigSchema
+
+
+def _get_path(doc, path):
+    for key in path.split("."):
+        if not isinstance(doc, dict) or key not in doc:
+            return None
+        doc = doc[key]
+    return doc
+
+
+def _set_path(doc, path, value):
+    *parents, last = path.split(".")
+    for key in parents:
+        doc = doc.setdefault(key, {})
+    doc[last] = value
+
+
+def _evaluate(expr, doc):
+    """Evaluate the subset of aggregation expressions the analytics pipelines use"""
+    if isinstance(expr, str) and expr.startswith("$"):
+        return _get_path(doc, expr[1:])
+    if isinstance(expr, list):
+        return [_evaluate(item, doc) for item in expr]
+    if not isinstance(expr, dict):
+        return expr
+
+    (operator, args), = expr.items()
+    values = _evaluate(args, doc)
+    if operator == "$add":
+        return sum(values)
+    if operator == "$multiply":
+        return math.prod(values)
+    if operator == "$divide":
+        return values[0] / values[1]
+    if operator == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if operator == "$gt":
+        return values[0] > values[1]
+    if operator == "$cond":
+        return values[1] if values[0] else values[2]
+    if operator == "$min":
+        return min(value for value in values if value is not None)
+    if operator == "$max":
+        return max(value for value in values if value is not None)
+    raise NotImplementedError(operator)
+
+
+class FakeCollection:
+    """In-memory collection applying pipeline-style updates"""
+
+    def __init__(self):
+        self.docs = []
+
+    async def update_one(self, query, pipeline, upsert=False):
+        doc = next((d for d in self.docs if all(d.get(k) == v for k, v in query.items())), None)
+        if doc is None:
+            assert upsert
+            doc = {"_id": ObjectId(), **query}
+            self.docs.append(doc)
+        for stage in pipeline:
+            (operator, fields), = stage.items()
+            assert operator == "$set"
+            # Every expression in a stage sees the document as it entered the stage
+            values = {path: _evaluate(expr, doc) for path, expr in fields.items()}
+            for path, value in values.items():
+                _set_path(doc, path, value)
+
+
+class FakeEngine:
+    def __init__(self):
+        self.collection = FakeCollection()
+
+    def get_collection(self, model):
+        assert model is WorkflowAnalytics
+        return self.collection
+
+
+TEMPLATE_ID = ObjectId()
+USER_ID = ObjectId()
+
+
+def _execution(status, duration, cost=0.0):
+    return WorkflowExecution(
+        execution_id=str(ObjectId()),
+        workflow_template_id=TEMPLATE_ID,
+        workflow_name="Workflow",
+        user_id=USER_ID,
+        session_id="session",
+        status=status,
+        total_duration=duration,
+        total_cost=cost,
+        created=datetime(2026, 1, 1, 12, 30),
+    )
+
+
+@pytest.fixture
+def analytics():
+    crud = CRUDWorkflowAnalytics(WorkflowAnalytics)
+    crud.engine = FakeEngine()
+    return crud
+
+
+def _stored(crud):
+    docs = crud.engine.collection.docs
+    assert len(docs) == 1
+    return WorkflowAnalytics.model_validate_doc(docs[0])
+
+
+class TestRecordExecution:
+    """Test folding finished executions into the day's analytics document"""
+
+    @pytest.mark.asyncio
+    async def test_first_execution_creates_document(self, analytics):
+        await analytics.record_execution(None, _execution(WorkflowStatus.COMPLETED, 4.0, cost=0.5))
+
+        stored = _stored(analytics)
+        assert stored.workflow_template_id == TEMPLATE_ID
+        assert stored.user_id == USER_ID
+        assert stored.date == datetime(2026, 1, 1)
+        assert stored.total_executions == 1
+        assert stored.successful_executions == 1
+        assert stored.failed_executions == 0
+        assert stored.average_duration == 4.0
+        assert stored.min_duration == 4.0
+        assert stored.max_duration == 4.0
+        assert stored.total_cost == 0.5
+
+    @pytest.mark.asyncio
+    async def test_later_executions_update_aggregates(self, analytics):
+        durations = [4.0, 1.0, 7.0, 2.0]
+        statuses = [
+            WorkflowStatus.COMPLETED,
+            WorkflowStatus.FAILED,
+            WorkflowStatus.COMPLETED,
+            WorkflowStatus.CANCELLED,
+        ]
+        for status, duration in zip(statuses, durations):
+            await analytics.record_execution(None, _execution(status, duration, cost=0.25))
+
+        stored = _stored(analytics)
+        assert stored.total_executions == 4
+        assert stored.successful_executions == 2
+        assert stored.failed_executions == 1
+        assert stored.cancelled_executions == 1
+        assert stored.min_duration == 1.0
+        assert stored.max_duration == 7.0
+        assert stored.average_duration == pytest.approx(sum(durations) / len(durations))
+        assert stored.sum_duration == pytest.approx(sum(durations))
+        assert stored.sum_sq_duration == pytest.approx(sum(d * d for d in durations))
+        assert stored.total_cost == pytest.approx(1.0)
+
+
+class TestRecordStepExecution:
+    """Test the per-step running averages"""
+
+    def _step(self, step_id, status, execution_time):
+        return WorkflowStepExecution(
+            execution_id=ObjectId(),
+            step_id=step_id,
+            step_name="Step",
+            step_type=StepType.AGENT,
+            status=status,
+            execution_time=execution_time,
+        )
+
+    @pytest.mark.asyncio
+    async def test_running_averages(self, analytics):
+        execution = _execution(WorkflowStatus.RUNNING, 0.0)
+        runs = [
+            ("fetch", WorkflowStatus.COMPLETED, 2.0),
+            ("fetch", WorkflowStatus.FAILED, 4.0),
+            ("fetch", WorkflowStatus.COMPLETED, 9.0),
+            ("summarize", WorkflowStatus.FAILED, 1.5),
+        ]
+        for step_id, status, execution_time in runs:
+            await analytics.record_step_execution(None, execution, self._step(step_id, status, execution_time))
+
+        stored = _stored(analytics)
+        assert stored.step_execution_counts == {"fetch": 3, "summarize": 1}
+        assert stored.step_success_rates["fetch"] == pytest.approx(200.0 / 3)
+        assert stored.step_success_rates["summarize"] == 0.0
+        assert stored.step_average_durations["fetch"] == pytest.approx(5.0)
+        assert stored.step_average_durations["summarize"] == 1.5
+
+    @pytest.mark.parametrize("step_id", ["a.b", "$step", ""])
+    def test_new_step_ids_must_be_usable_as_field_names(self, step_id):
+        with pytest.raises(ValidationError):
+            WorkflowStepConfigSchema(step_id=step_id, name="Step", step_type="agent")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("step_id", ["step 1", "a.b", "$step"])
+    async def test_stored_unsafe_step_ids_load_and_are_skipped(self, analytics, step_id):
+        step = WorkflowStepExecution.model_validate_doc(
+            self._step(step_id, WorkflowStatus.COMPLETED, 1.0).model_dump_doc()
+        )
+
+        await analytics.record_step_execution(None, _execution(WorkflowStatus.RUNNING, 0.0), step)
+
+        assert step.step_id == step_id
+        assert analytics.engine.collection.docs == []
+
+    @pytest.mark.asyncio
+    async def test_finished_step_is_folded_once(self, monkeypatch):
+        steps = CRUDWorkflowStepExecution(WorkflowStepExecution)
+        step = self._step("fetch", WorkflowStatus.RUNNING, 0.0)
+        steps.get = AsyncMock(return_value=step)
+        steps.engine = AsyncMock()
+        steps.engine.save.side_effect = lambda doc: doc
+        execution = _execution(WorkflowStatus.RUNNING, 0.0)
+        monkeypatch.setattr(crud_workflow_execution, "get", AsyncMock(return_value=execution))
+        monkeypatch.setattr(crud_workflow_analytics, "record_step_execution", AsyncMock())
+
+        await steps.update_step_status(None, step.id, WorkflowStatus.COMPLETED, execution_time=2.0)
+        await steps.update_step_status(None, step.id, WorkflowStatus.COMPLETED, output_data={"answer": 42})
+
+        crud_workflow_analytics.record_step_execution.assert_awaited_once()
+
+
+class TestExecutionCompletion:
+    """Test that an execution is folded into analytics only once"""
+
+    @pytest.fixture
+    def executions(self, monkeypatch):
+        crud = CRUDWorkflowExecution(WorkflowExecution)
+        execution = _execution(WorkflowStatus.RUNNING, 0.0)
+        crud.get_by_execution_id = AsyncMock(return_value=execution)
+        crud.engine = AsyncMock()
+        crud.engine.save.side_effect = lambda doc: doc
+        monkeypatch.setattr(crud_workflow_analytics, "record_execution", AsyncMock())
+        return crud
+
+    @pytest.mark.asyncio
+    async def test_complete_records_once(self, executions):
+        await executions.complete_execution(None, "execution", total_duration=3.0)
+        await executions.complete_execution(None, "execution", total_duration=3.0)
+
+        crud_workflow_analytics.record_execution.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_fail_after_complete_is_not_recorded_again(self, executions):
+        await executions.complete_execution(None, "execution", total_duration=3.0)
+        await executions.fail_execution(None, "execution", error_details={"error": "late"})
+
+        crud_workflow_analytics.record_execution.assert_awaited_once()
+
+
+class TestMarkStepCompleted:
+    """Test the atomic step progress update"""
+
+    @pytest.fixture
+    def executions(self):
+        crud = CRUDWorkflowExecution(WorkflowExecution)
+        crud.engine = Mock()
+        crud.engine.get_collection.return_value.find_one_and_update = AsyncMock(return_value=None)
+        return crud
+
+    @pytest.mark.asyncio
+    async def test_only_unfinished_executions_progress(self, executions):
+        result = await executions.mark_step_completed(None, "execution", step_index=2, step_id="fetch")
+
+        query, update = executions.engine.get_collection.return_value.find_one_and_update.await_args.args
+        assert query == {"execution_id": "execution", "status": {"$in": ["pending", "running"]}}
+        assert "status" not in update["$set"]
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_retried_step_does_not_overcount(self, executions):
+        for _ in range(2):
+            await executions.mark_step_completed(None, "execution", step_index=2, step_id="fetch")
+
+        for call in executions.engine.get_collection.return_value.find_one_and_update.await_args_list:
+            _, update = call.args
+            assert update == {"$set": {**update["$set"], "steps_completed": 3}}